@@ -6,42 +6,61 @@ import logging
 import asyncio
 from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Optional
 
 from tenacity import retry, stop_after_attempt, wait_exponential, before_sleep_log
-from playwright.async_api import async_playwright, TimeoutError as PWTimeoutError
 from dotenv import load_dotenv
-from openai import OpenAI
 
-# ---------- Setup ----------
-load_dotenv()
+from backends import get_planner, heuristic_plan
+from blob_store import BlobStore, StoredBlob
+from browser_pool import BrowserPool
+from download_manifest import DownloadManifest
+from planner_cache import PlannerDecisionCache, page_state_fingerprint
+from selector_stats import SelectorStats
+from single_flight import SingleFlight
+from request_filter import DEFAULT_REQUEST_FILTER, RequestFilter
 
+# ---------- Setup ----------
 SANDBOX_DIR = "sandbox"
 DOWNLOADS_DIR = os.path.join(SANDBOX_DIR, "downloads")
 LOGS_DIR = os.path.join(SANDBOX_DIR, "logs")
 SCREENSHOTS_DIR = os.path.join(SANDBOX_DIR, "screenshots")
 HANDOFF_PATH = os.path.join(SANDBOX_DIR, "handoff.json")
-
-os.makedirs(DOWNLOADS_DIR, exist_ok=True)
-os.makedirs(LOGS_DIR, exist_ok=True)
-os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
+PLANNER_CACHE_PATH = os.path.join(SANDBOX_DIR, "planner_cache.sqlite")
+SELECTOR_STATS_PATH = os.path.join(SANDBOX_DIR, "selector_stats.sqlite")
+MANIFEST_PATH = os.path.join(SANDBOX_DIR, "download_manifest.sqlite")
 
 logger = logging.getLogger("agent_a")
-logger.setLevel(logging.INFO)
+_runtime_ready = False
 
-# file log
-fh = logging.FileHandler(os.path.join(LOGS_DIR, "agent_a.log"), encoding="utf-8")
-fh.setLevel(logging.INFO)
-fh.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
-logger.addHandler(fh)
 
-# console log
-ch = logging.StreamHandler()
-ch.setLevel(logging.INFO)
-ch.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
-logger.addHandler(ch)
-
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+def setup_runtime() -> None:
+    """
+    .env, sandbox directories and log handlers, done once when the first DownloadAgent is
+    built rather than at import (main.py --help and query-only runs never pay for it).
+    Playwright itself is imported by the functions that drive a page.
+    """
+    global _runtime_ready
+    if _runtime_ready:
+        return
+    load_dotenv()
+    os.makedirs(DOWNLOADS_DIR, exist_ok=True)
+    os.makedirs(LOGS_DIR, exist_ok=True)
+    os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
+    logger.setLevel(logging.INFO)
+
+    # file log
+    fh = logging.FileHandler(os.path.join(LOGS_DIR, "agent_a.log"), encoding="utf-8")
+    fh.setLevel(logging.INFO)
+    fh.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    logger.addHandler(fh)
+
+    # console log
+    ch = logging.StreamHandler()
+    ch.setLevel(logging.INFO)
+    ch.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    logger.addHandler(ch)
+    _runtime_ready = True
 
 # ---------- Handoff schema ----------
 @dataclass
@@ -65,6 +84,26 @@ def _sha256_file(path: str) -> str:
     return h.hexdigest()
 
 
+async def _save_download(download, store: BlobStore, name: str) -> StoredBlob:
+    """
+    Places the finished download in the content-addressed store under `name`. Playwright's
+    temp file is hardlinked in (no copy) when the browser was launched with the store's
+    incoming_dir as downloads_path, as DownloadAgent's own and the batch pool are; other
+    pools' files are copied with the hash computed in the same pass. Either way off the
+    event loop. Falls
+    back to save_as when the temp path is not available (e.g. a remote browser).
+    """
+    try:
+        src = await download.path()
+    except Exception:
+        src = None
+    if src:
+        return await asyncio.to_thread(store.put_file, str(src), name)
+    incoming = store.incoming_path()
+    await download.save_as(incoming)
+    return await asyncio.to_thread(store.adopt, incoming, name)
+
+
 async def _safe_screenshot(page, label: str) -> str:
     ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
     out = os.path.join(SCREENSHOTS_DIR, f"{label}_{ts}.png")
@@ -76,58 +115,130 @@ async def _safe_screenshot(page, label: str) -> str:
     return out
 
 
+# Same candidate set and limits as the former per-element locator loop: first 40 matches,
+# visible only, aria-label preferred over text, whitespace collapsed, 80 chars, 25 unique.
+# querySelectorAll stops at shadow roots, while page.locator's CSS pierces open ones, so
+# the DOM is walked in document order and descends into every open shadowRoot (closed
+# roots are unreachable to both).
+_PAGE_STATE_JS = """
+({selector, scan, keep, width}) => {
+  const buttons = [], controls = [], seen = new Set(), els = [];
+  const visit = (root) => {
+    const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT);
+    for (let el = walker.nextNode(); el && els.length < scan; el = walker.nextNode()) {
+      if (el.matches(selector)) els.push(el);
+      if (el.shadowRoot) visit(el.shadowRoot);
+    }
+  };
+  visit(document);
+  for (const el of els) {
+    const r = el.getBoundingClientRect();
+    if (!(r.width > 0 && r.height > 0) || getComputedStyle(el).visibility === "hidden") continue;
+    const aria = (el.getAttribute("aria-label") || "").trim();
+    const cand = (aria || (el.innerText || "").trim()).split(/\\s+/).join(" ").slice(0, width);
+    if (!cand || seen.has(cand)) continue;
+    seen.add(cand);
+    buttons.push(cand);
+    controls.push({
+      label: cand,
+      role: el.getAttribute("role") || el.tagName.toLowerCase(),
+      box: [Math.round(r.x), Math.round(r.y), Math.round(r.width), Math.round(r.height)],
+    });
+    if (buttons.length >= keep) break;
+  }
+  return {title: document.title, buttons, controls};
+}
+"""
+_PAGE_STATE_SELECTOR = "button, [role='button'], a[role='button'], div[aria-label], button[aria-label]"
+
+
 async def _collect_page_state(page) -> Dict[str, Any]:
     """
     Small, safe page snapshot so GPT-5-mini can reason.
     Keep it short: title, url, visible buttons/labels (limited).
+    One page.evaluate round trip; `controls` adds role and bounding box per button.
     """
-    title = ""
-    try:
-        title = await page.title()
-    except:
-        pass
-
     url = ""
     try:
         url = page.url
     except:
         pass
 
-    # Grab visible button-like texts (limited)
-    button_texts: List[str] = []
     try:
-        # Many Drive controls are div/button with aria-label. We capture both.
-        # Limit to keep prompt small.
-        loc = page.locator("button, [role='button'], a[role='button'], div[aria-label], button[aria-label]")
-        count = await loc.count()
-        limit = min(count, 40)
-        for i in range(limit):
-            el = loc.nth(i)
-            try:
-                visible = await el.is_visible()
-                if not visible:
-                    continue
-                txt = (await el.inner_text()) or ""
-                aria = (await el.get_attribute("aria-label")) or ""
-                cand = (aria.strip() or txt.strip())
-                if cand:
-                    cand = " ".join(cand.split())
-                    button_texts.append(cand[:80])
-            except:
-                continue
-        # de-dup
-        button_texts = list(dict.fromkeys(button_texts))[:25]
-    except:
+        state = await page.evaluate(
+            _PAGE_STATE_JS,
+            {"selector": _PAGE_STATE_SELECTOR, "scan": 40, "keep": 25, "width": 80},
+        )
+    except Exception as e:
+        logger.info(f"Page state collection failed: {e}")
+        state = {"title": "", "buttons": [], "controls": []}
+
+    return {"title": state["title"], "url": url, "buttons": state["buttons"], "controls": state["controls"]}
+
+
+# Upper bounds for readiness waits (they return as soon as the condition holds).
+READY_TIMEOUT_MS = 10_000
+NETWORK_IDLE_TIMEOUT_MS = 5_000
+DOWNLOAD_WARNING_TIMEOUT_MS = 5_000
+MENU_TIMEOUT_MS = 3_000
+PLANNER_TIMEOUT_ENV = "AGENT_A_PLANNER_TIMEOUT"
+DEFAULT_PLANNER_TIMEOUT_S = 30.0
+# "visible=true" keeps the match set to visible nodes, so a hidden Download-labelled node
+# earlier in the DOM (Drive has several) cannot hold the wait until its timeout.
+_READY_CSS = '[aria-label*="Download"], [data-tooltip="Download"], [aria-label*="More actions"] >> visible=true'
+
+
+async def _wait_until_ready(page) -> str:
+    """
+    Replaces the fixed post-navigation sleep: wait for any download-related control to
+    be visible, else for network idle, each bounded. Returns what ended the wait.
+    """
+    from playwright.async_api import TimeoutError as PWTimeoutError
+
+    ready = page.get_by_role("button", name="Download anyway").or_(page.locator(_READY_CSS))
+    try:
+        await ready.first.wait_for(state="visible", timeout=READY_TIMEOUT_MS)
+        return "controls"
+    except PWTimeoutError:
         pass
+    try:
+        await page.wait_for_load_state("networkidle", timeout=NETWORK_IDLE_TIMEOUT_MS)
+        return "networkidle"
+    except PWTimeoutError:
+        return "timeout"
+
 
-    return {"title": title, "url": url, "buttons": button_texts}
+class _StepTimer:
+    """Per-step wall time for one run; logged as a single breakdown line."""
 
+    def __init__(self):
+        self.steps: Dict[str, float] = {}
+        self._start = self._last = time.perf_counter()
+
+    def mark(self, step: str) -> None:
+        now = time.perf_counter()
+        self.steps[step] = round(self.steps.get(step, 0.0) + now - self._last, 3)
+        self._last = now
+
+    def summary(self) -> Dict[str, float]:
+        return {**self.steps, "total": round(time.perf_counter() - self._start, 3)}
 
-def _call_gpt5_mini_plan(page_state: Dict[str, Any], attempt: int) -> Dict[str, Any]:
+
+async def _call_gpt5_mini_plan(
+    page_state: Dict[str, Any],
+    attempt: int,
+    backend: Optional[str] = None,
+    timeout_s: Optional[float] = None,
+) -> Dict[str, Any]:
     """
     GPT-5-mini chooses next action from a strict action set (guardrail).
     This satisfies: "Uses GPT-5-mini for reasoning".
+    `backend` picks the planner from backends.PLANNER_BACKENDS ("local" = offline heuristic).
+    Runs on the event loop without blocking it; past timeout_s (default: $AGENT_A_PLANNER_TIMEOUT,
+    read per call so a value from .env applies) the heuristic plan is used.
     """
+    if timeout_s is None:
+        timeout_s = float(os.getenv(PLANNER_TIMEOUT_ENV) or DEFAULT_PLANNER_TIMEOUT_S)
     system = (
         "You are Agent A's planner. Choose the next browser action to download a Google Drive PDF. "
         "You MUST choose one action from the allowed list and provide a short rationale. "
@@ -144,7 +255,8 @@ def _call_gpt5_mini_plan(page_state: Dict[str, Any], attempt: int) -> Dict[str,
 
     user = {
         "attempt": attempt,
-        "page_state": page_state,
+        # Planner sees the compact view; controls (roles/boxes) stay local to keep prompts small.
+        "page_state": {k: page_state.get(k) for k in ("title", "url", "buttons")},
         "allowed_actions": allowed_actions,
         "json_schema": {
             "action": "one of allowed_actions",
@@ -152,26 +264,13 @@ def _call_gpt5_mini_plan(page_state: Dict[str, Any], attempt: int) -> Dict[str,
         }
     }
 
-    # Prefer Responses API, fallback to chat.completions if needed.
     try:
-        resp = client.responses.create(
-            model="gpt-5-mini",
-            input=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": json.dumps(user)},
-            ],
-        )
-        text = resp.output_text.strip()
-    except Exception:
-        chat = client.chat.completions.create(
-            model="gpt-5-mini",
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": json.dumps(user)},
-            ],
-        )
-
-        text = chat.choices[0].message.content.strip()
+        text = await asyncio.wait_for(get_planner(backend)(system, user), timeout=timeout_s)
+    except asyncio.TimeoutError:
+        plan = heuristic_plan(page_state, attempt)
+        plan["rationale"] = f"Planner timed out after {timeout_s:g}s; heuristic fallback. " + plan["rationale"]
+        logger.info(f"Planner timeout ({timeout_s:g}s); using heuristic plan {plan['action']}.")
+        return plan
 
     try:
         plan = json.loads(text)
@@ -182,9 +281,78 @@ def _call_gpt5_mini_plan(page_state: Dict[str, Any], attempt: int) -> Dict[str,
         return {"action": "REFRESH_AND_RETRY_SELECTORS", "rationale": "Non-JSON output; fallback."}
 
 
+# Stable names (persisted in SelectorStats) -> locator factory; list order is the
+# default priority for candidates without history.
+_DOWNLOAD_BUTTON_CANDIDATES = [
+    ("label=Download", lambda page: page.get_by_label("Download")),
+    ("label=Download file", lambda page: page.get_by_label("Download file")),
+    ("role=button[name=Download]", lambda page: page.get_by_role("button", name="Download")),
+    ('div[aria-label="Download"]', lambda page: page.locator('div[aria-label="Download"]')),
+    ('button[aria-label*="Download"]', lambda page: page.locator('button[aria-label*="Download"]')),
+    ('div[data-tooltip="Download"]', lambda page: page.locator('div[data-tooltip="Download"]')),
+]
+
+
+async def _timed_probe(name: str, loc, need_visible: bool = True):
+    """(name, locator, hit, latency_ms) for one candidate; errors count as a miss."""
+    t0 = time.perf_counter()
+    try:
+        hit = await loc.count() > 0 and (not need_visible or await loc.first.is_visible())
+    except Exception:
+        hit = False
+    return name, loc, hit, (time.perf_counter() - t0) * 1000
+
+
 class DownloadAgent:
-    def __init__(self):
-        logger.info("Agent A init: reasoner=gpt-5-mini executor=playwright(chromium)")
+    def __init__(
+        self,
+        planner: Optional[str] = None,
+        pool: Optional[BrowserPool] = None,
+        browser_profile: Optional[str] = None,
+        planner_cache_path: Optional[str] = PLANNER_CACHE_PATH,
+        selector_stats_path: Optional[str] = SELECTOR_STATS_PATH,
+        request_filter: Optional[RequestFilter] = DEFAULT_REQUEST_FILTER,
+        manifest_path: Optional[str] = MANIFEST_PATH,
+        manifest_max_age_s: float = 24 * 3600,
+    ):
+        """
+        `pool` lets several agents (or batch runs) share long-lived browsers; by default the
+        agent owns a single-browser pool that lives until close(), launched with
+        `browser_profile` (headed / headless / new-headless, see browser_pool.LAUNCH_PROFILES).
+        `planner_cache_path` persists which action downloaded for each page layout, so known
+        layouts skip the planner; `selector_stats_path` persists download-button selector hit
+        rates used to rank candidates. `request_filter` aborts requests the download flow
+        never needs (images, fonts, telemetry, preview tiles). `manifest_path` remembers
+        URL -> handoff so a URL fetched within manifest_max_age_s is answered without a
+        browser. None disables any of these.
+        """
+        setup_runtime()
+        self.planner = planner
+        self.store = BlobStore(DOWNLOADS_DIR)
+        # Downloads land on the store's filesystem, so _save_download links instead of copying.
+        self.pool = pool or BrowserPool(profile=browser_profile, downloads_path=self.store.incoming_dir)
+        self._owns_pool = pool is None
+        self.decision_cache = PlannerDecisionCache(planner_cache_path) if planner_cache_path else None
+        self.selector_stats = SelectorStats(selector_stats_path) if selector_stats_path else None
+        self.request_filter = request_filter
+        self.manifest = DownloadManifest(manifest_path, max_age_s=manifest_max_age_s) if manifest_path else None
+        self._flights = SingleFlight()
+        logger.info(f"Agent A init: reasoner=gpt-5-mini planner_backend={planner or 'default'} executor=playwright(chromium) launch={self.pool.launch_options}")
+
+    async def close(self) -> None:
+        # Downloads whose callers all gave up are cancelled already; stop any stragglers
+        # before the manifest and pool they use are closed under them.
+        await self._flights.cancel_all()
+        if self.manifest is not None:
+            logger.info(f"Download manifest: {self.manifest.stats()} coalescing: {self._flights.stats}")
+            self.manifest.close()
+        if self.decision_cache is not None:
+            logger.info(f"Planner decision cache: {self.decision_cache.stats()}")
+            self.decision_cache.close()
+        if self.selector_stats is not None:
+            self.selector_stats.close()
+        if self._owns_pool:
+            await self.pool.close()
 
     async def _try_click_download_anyway(self, page) -> bool:
         btn = page.get_by_role("button", name="Download anyway")
@@ -197,37 +365,57 @@ class DownloadAgent:
             pass
         return False
 
+    async def _settle_after_click(self, page, dlinfo) -> None:
+        """
+        After a download click, return as soon as the download event fires; if Drive's
+        "Download anyway" interstitial shows up first, click through it. Bounded by
+        DOWNLOAD_WARNING_TIMEOUT_MS (the surrounding expect_download keeps its own timeout).
+        """
+        from playwright.async_api import TimeoutError as PWTimeoutError
+
+        warning = page.get_by_role("button", name="Download anyway").first
+        deadline = time.monotonic() + DOWNLOAD_WARNING_TIMEOUT_MS / 1000
+        while not dlinfo.is_done() and time.monotonic() < deadline:
+            try:
+                await warning.wait_for(state="visible", timeout=250)
+            except PWTimeoutError:
+                continue
+            await self._try_click_download_anyway(page)
+            return
+
     async def _try_click_download_button(self, page) -> Optional[Any]:
         """
         Try common download locators (main page + iframes).
         Returns a locator if found else None.
+        All candidates are probed concurrently; among the hits, the one with the best
+        historical hit rate (SelectorStats) wins.
         """
-        logger.info("Step: Searching for download button in main page selectors.")
-        candidates = [
-            page.get_by_label("Download"),
-            page.get_by_label("Download file"),
-            page.get_by_role("button", name="Download"),
-            page.locator('div[aria-label="Download"]'),
-            page.locator('button[aria-label*="Download"]'),
-            page.locator('div[data-tooltip="Download"]'),
-        ]
-        for idx, loc in enumerate(candidates):
-            try:
-                if await loc.count() > 0 and await loc.first.is_visible():
-                    logger.info(f"Step: Download selector hit (main): candidate[{idx}]")
-                    return loc.first
-            except:
-                continue
+        logger.info("Step: Probing download button selectors (main page).")
+        names = [name for name, _ in _DOWNLOAD_BUTTON_CANDIDATES]
+        if self.selector_stats is not None:
+            names = self.selector_stats.rank(names)
+        factories = dict(_DOWNLOAD_BUTTON_CANDIDATES)
+        results = await asyncio.gather(*[_timed_probe(name, factories[name](page)) for name in names])
+        logger.info(
+            "Step: selector probes (ms, * = hit): "
+            + ", ".join(f"{name}={ms:.1f}{'*' if hit else ''}" for name, _, hit, ms in results)
+        )
+        if self.selector_stats is not None:
+            self.selector_stats.record({name: hit for name, _, hit, _ in results})
+        for name, loc, hit, _ in results:
+            if hit:
+                logger.info(f"Step: Download selector hit (main): {name}")
+                return loc.first
 
         logger.info("Step: Searching for download button inside iframes.")
-        for fr in page.frames:
-            try:
-                btn = fr.get_by_label("Download")
-                if await btn.count() > 0:
-                    logger.info(f"Step: Download selector hit (iframe): frame={fr.name}")
-                    return btn.first
-            except:
-                continue
+        frames = list(page.frames)
+        results = await asyncio.gather(
+            *[_timed_probe(fr.name, fr.get_by_label("Download"), need_visible=False) for fr in frames]
+        )
+        for name, loc, hit, _ in results:
+            if hit:
+                logger.info(f"Step: Download selector hit (iframe): frame={name}")
+                return loc.first
         return None
 
     async def _overflow_menu_download(self, page) -> bool:
@@ -253,9 +441,14 @@ class DownloadAgent:
             return False
 
         await menu.click()
-        await asyncio.sleep(1)
+
+        from playwright.async_api import TimeoutError as PWTimeoutError
 
         dl = page.get_by_role("menuitem", name="Download")
+        try:
+            await dl.first.wait_for(state="visible", timeout=MENU_TIMEOUT_MS)
+        except PWTimeoutError:
+            pass
         if await dl.count() == 0:
             dl = page.get_by_text("Download")
 
@@ -268,30 +461,65 @@ class DownloadAgent:
             pass
         return False
 
+    async def run(
+        self,
+        url: str,
+        max_seconds: int = 600,
+        write_handoff: bool = True,
+        force_refresh: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Returns the handoff for `url`: straight from the download manifest when the URL was
+        fetched recently (no browser is leased), otherwise via the browser flow.
+        force_refresh=True always downloads. Concurrent calls for the same URL share one
+        browser download and all receive its handoff. write_handoff=False skips HANDOFF_PATH
+        (batch runs record each result themselves).
+        """
+        payload = self.manifest.lookup(url, force_refresh=force_refresh) if self.manifest else None
+        if payload is not None:
+            logger.info(f"Agent A: manifest hit for {url} (sha256={payload['sha256']}); skipping browser.")
+        else:
+            if self._flights.in_flight(url):
+                logger.info(f"Agent A: joining in-flight download for {url}")
+            payload = await self._flights.do(url, lambda: self._download_and_record(url, max_seconds))
+
+        if write_handoff:
+            with open(HANDOFF_PATH, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=2)
+            logger.info(f"Step: wrote handoff -> {HANDOFF_PATH}")
+        return payload
+
+    async def _download_and_record(self, url: str, max_seconds: int) -> Dict[str, Any]:
+        payload = await self._download(url, max_seconds=max_seconds)
+        if self.manifest is not None:
+            self.manifest.record(url, payload)
+        return payload
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
         before_sleep=before_sleep_log(logger, logging.INFO),
         reraise=True,
     )
-    async def run(self, url: str, max_seconds: int = 600) -> Dict[str, Any]:
+    async def _download(self, url: str, max_seconds: int = 600) -> Dict[str, Any]:
         """
         Downloads a provided Google Drive PDF (through browser flow, no API).
         Retries on failure, stores in sandbox, logs each step.
         """
         start = time.time()
+        timer = _StepTimer()
         logger.info(f"Agent A start: url={url}")
 
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=False,
-                args=["--disable-blink-features=AutomationControlled"]
-            )
-            context = await browser.new_context(
-                accept_downloads=True,
-                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            )
+        # Each attempt (including tenacity retries) leases a fresh context from the pool
+        # instead of launching Chromium; the context is closed when the lease ends.
+        async with self.pool.lease() as context:
+            request_stats = await self.request_filter.attach(context) if self.request_filter else None
             page = await context.new_page()
+            guard_task = None
+            fingerprint = None
+            plan = None
+            download = None
+            timer.mark("lease")
 
             try:
                 # Guardrail: ensure we never exceed max_seconds within this agent call
@@ -305,15 +533,26 @@ class DownloadAgent:
 
                 logger.info("Step: goto url")
                 await page.goto(url, wait_until="domcontentloaded", timeout=60_000)
-                await asyncio.sleep(3)  # Drive scripts
+                timer.mark("goto")
+                ready = await _wait_until_ready(page)  # Drive scripts
+                timer.mark("ready")
+                logger.info(f"Step: page ready ({ready})")
 
                 # Create page state and let GPT-5-mini choose a strategy
                 page_state = await _collect_page_state(page)
-                plan = _call_gpt5_mini_plan(page_state, attempt=1)
-                logger.info(f"Planner(gpt-5-mini): {plan}")
+                timer.mark("page_state")
+                if self.decision_cache is not None:
+                    fingerprint = page_state_fingerprint(page_state)
+                    plan = self.decision_cache.lookup(fingerprint)
+                if plan is not None:
+                    timer.mark("plan")
+                    logger.info(f"Planner(cache): {plan}")
+                else:
+                    plan = await _call_gpt5_mini_plan(page_state, attempt=1, backend=self.planner)
+                    timer.mark("plan")
+                    logger.info(f"Planner(gpt-5-mini): {plan}")
 
                 # Execute plan with strict actions
-                download = None
 
                 async def _expect_download_after(action_fn):
                     nonlocal download
@@ -335,9 +574,8 @@ class DownloadAgent:
                     async with page.expect_download(timeout=60_000) as dlinfo:
                         logger.info("Step: click download button")
                         await btn.click(force=True)
-                        await asyncio.sleep(1)
                         # Sometimes a secondary warning appears
-                        await self._try_click_download_anyway(page)
+                        await self._settle_after_click(page, dlinfo)
                     download = await dlinfo.value
 
                 elif plan["action"] == "OPEN_OVERFLOW_MENU_AND_DOWNLOAD":
@@ -345,14 +583,15 @@ class DownloadAgent:
                         ok = await self._overflow_menu_download(page)
                         if not ok:
                             raise RuntimeError("Overflow download failed.")
-                        await asyncio.sleep(1)
-                        await self._try_click_download_anyway(page)
+                        await self._settle_after_click(page, dlinfo)
                     download = await dlinfo.value
 
                 elif plan["action"] == "REFRESH_AND_RETRY_SELECTORS":
                     logger.info("Step: refresh and retry selectors")
                     await page.reload(wait_until="domcontentloaded", timeout=60_000)
-                    await asyncio.sleep(3)
+                    ready = await _wait_until_ready(page)
+                    timer.mark("reload")
+                    logger.info(f"Step: page ready after reload ({ready})")
                     btn = await self._try_click_download_button(page)
                     if not btn:
                         # try overflow as fallback
@@ -361,14 +600,12 @@ class DownloadAgent:
                             ok = await self._overflow_menu_download(page)
                             if not ok:
                                 raise RuntimeError("No download route found after refresh.")
-                            await asyncio.sleep(1)
-                            await self._try_click_download_anyway(page)
+                            await self._settle_after_click(page, dlinfo)
                         download = await dlinfo.value
                     else:
                         async with page.expect_download(timeout=60_000) as dlinfo:
                             await btn.click(force=True)
-                            await asyncio.sleep(1)
-                            await self._try_click_download_anyway(page)
+                            await self._settle_after_click(page, dlinfo)
                         download = await dlinfo.value
 
                 else:
@@ -376,45 +613,56 @@ class DownloadAgent:
 
                 if not download:
                     raise RuntimeError("Download did not start (no download object).")
+                timer.mark("download")
+                if fingerprint is not None:
+                    self.decision_cache.record(fingerprint, plan["action"], success=True)
 
                 suggested = download.suggested_filename or "downloaded_doc.pdf"
                 # Ensure .pdf extension if Drive returns something odd
                 if not suggested.lower().endswith(".pdf"):
                     suggested = suggested + ".pdf"
 
-                save_path = os.path.join(DOWNLOADS_DIR, suggested)
-                logger.info(f"Step: saving download to {save_path}")
-                await download.save_as(save_path)
-
-                file_bytes = os.path.getsize(save_path)
-                file_sha = _sha256_file(save_path)
+                stored = await _save_download(download, self.store, suggested)
+                timer.mark("save_and_hash")
+                logger.info(
+                    f"Step: stored download sha256={stored.sha256} -> {stored.path}"
+                    + (" (content already in store)" if stored.deduplicated else "")
+                )
 
                 payload = HandoffPayload(
                     status="success",
-                    file_path=os.path.abspath(save_path),
-                    file_name=suggested,
+                    file_path=os.path.abspath(stored.path),
+                    file_name=stored.name,
                     source_url=url,
-                    sha256=file_sha,
-                    bytes=file_bytes,
+                    sha256=stored.sha256,
+                    bytes=stored.bytes,
                     downloaded_at_iso=datetime.now(timezone.utc).isoformat(),
                     notes="Downloaded via Playwright browser flow (no Google Drive API). Planner used gpt-5-mini.",
                     extra={
                         "executor": "playwright-chromium",
                         "reasoner": "gpt-5-mini",
+                        "timings_s": timer.summary(),
+                        "requests": request_stats.to_dict() if request_stats else None,
+                        "blob_path": os.path.abspath(stored.blob_path),
+                        "deduplicated": stored.deduplicated,
                     },
                 )
 
-                with open(HANDOFF_PATH, "w", encoding="utf-8") as f:
-                    json.dump(asdict(payload), f, indent=2)
-                logger.info(f"Step: wrote handoff -> {HANDOFF_PATH}")
-
-                guard_task.cancel()
+                logger.info(f"Agent A timings (s): {timer.summary()}")
+                if request_stats:
+                    logger.info(f"Agent A request filter: {request_stats.to_dict()}")
                 logger.info("Agent A: success.")
                 return asdict(payload)
 
-            except (PWTimeoutError, Exception) as e:
+            except Exception as e:  # Playwright timeouts included
                 logger.error(f"Agent A error: {repr(e)}")
+                if fingerprint is not None and plan is not None and download is None:
+                    # Only the plan's own outcome counts; later save/hash errors are not its fault.
+                    self.decision_cache.record(fingerprint, plan["action"], success=False)
+                logger.info(f"Agent A timings until error (s): {timer.summary()}")
                 await _safe_screenshot(page, "agent_a_error")
                 raise
             finally:
-                await browser.close()
+                # The pool outlives this call, so the guard must not keep ticking after it.
+                if guard_task is not None:
+                    guard_task.cancel()
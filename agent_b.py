@@ -1,53 +1,328 @@
 import os
+import re
 import json
+import time
+import queue
 import logging
-from typing import Dict, Any, List
+import threading
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, Any, FrozenSet, Iterator, List, Optional, Tuple, Union
 
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
+import faiss
 from langchain_community.vectorstores import FAISS
-from langchain.chains import RetrievalQA
-from langchain.prompts import PromptTemplate
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+
+from embedding_cache import EmbeddingCache, CachedEmbeddings, DEFAULT_MAX_BYTES
+from backends import get_embeddings, get_llm
+from index_store import IndexSpec, SQLiteDocstore, build_archive, load_index, read_index_meta, save_index, close_index
 
 SANDBOX_DIR = "sandbox"
 LOGS_DIR = os.path.join(SANDBOX_DIR, "logs")
 HANDOFF_PATH = os.path.join(SANDBOX_DIR, "handoff.json")
+INDEX_DIR = os.path.join(SANDBOX_DIR, "indexes")
+EMBED_CACHE_PATH = os.path.join(SANDBOX_DIR, "embedding_cache.sqlite")
+
+# Same defaults PyPDFLoader.load_and_split() used implicitly; recorded with each
+# persisted index so a change here invalidates it.
+CHUNK_SIZE = 4000
+CHUNK_OVERLAP = 200
+INDEX_FORMAT_VERSION = 3
+# The collection-level archive lives beside the per-document dirs (not a sha256, so
+# resolve_sha256 never matches it). It is rebuilt once at least this many documents, and
+# as many as it already holds, are outside it, so rebuild cost stays linear overall.
+ARCHIVE_DIR_NAME = "_archive"
+COMPACT_AFTER = 64
+
+# Below this many pages the process pool costs more than it saves.
+PARALLEL_EXTRACT_MIN_PAGES = 64
 
-os.makedirs(LOGS_DIR, exist_ok=True)
+# Streaming index pipeline: chunks per embedding request and bounded queue depths
+# (backpressure keeps at most a few batches of pages/vectors in memory at once).
+EMBED_BATCH_SIZE = 64
+PIPELINE_QUEUE_SIZE = 4
 
 logger = logging.getLogger("agent_b")
-logger.setLevel(logging.INFO)
-fh = logging.FileHandler(os.path.join(LOGS_DIR, "agent_b.log"), encoding="utf-8")
-fh.setLevel(logging.INFO)
-fh.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
-logger.addHandler(fh)
-ch = logging.StreamHandler()
-ch.setLevel(logging.INFO)
-ch.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
-logger.addHandler(ch)
-
-
-GUARDED_QA_PROMPT = PromptTemplate(
-    input_variables=["context", "question"],
-    template=(
-        "You are Agent B. Answer the question using ONLY the context provided.\n"
-        "If the context does not contain the answer, say: \"I don't know based on the document.\"\n"
-        "Keep the answer concise.\n\n"
-        "Context:\n{context}\n\n"
-        "Question: {question}\n"
-        "Answer:"
-    ),
+_runtime_ready = False
+
+
+def _setup_runtime() -> None:
+    """
+    .env, log directory and handlers, done once when the first QueryAgent is built rather
+    than at import, so importing this module has no filesystem side effects. Query-only
+    runs never import agent_a, so the API keys in .env are loaded here too.
+    """
+    global _runtime_ready
+    if _runtime_ready:
+        return
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    os.makedirs(LOGS_DIR, exist_ok=True)
+    logger.setLevel(logging.INFO)
+    fh = logging.FileHandler(os.path.join(LOGS_DIR, "agent_b.log"), encoding="utf-8")
+    fh.setLevel(logging.INFO)
+    fh.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    logger.addHandler(fh)
+    ch = logging.StreamHandler()
+    ch.setLevel(logging.INFO)
+    ch.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    logger.addHandler(ch)
+    _runtime_ready = True
+
+
+# pypdf, the text splitter and langchain's QA chain are imported where they are used:
+# opening persisted indexes needs none of them, and they dominate import time.
+GUARDED_QA_TEMPLATE = (
+    "You are Agent B. Answer the question using ONLY the context provided.\n"
+    "If the context does not contain the answer, say: \"I don't know based on the document.\"\n"
+    "Keep the answer concise.\n\n"
+    "Context:\n{context}\n\n"
+    "Question: {question}\n"
+    "Answer:"
 )
 
 
+def _embedding_model_name(embeddings: Embeddings) -> str:
+    return getattr(embeddings, "model", None) or type(embeddings).__name__
+
+
+def _index_path(index_dir: str, sha256: str, model: str) -> str:
+    """
+    On-disk location of a persisted index: one folder per document hash,
+    one sub-folder per embedding model (vectors are not portable across models).
+    """
+    model_slug = re.sub(r"[^A-Za-z0-9._-]+", "_", model)
+    return os.path.join(index_dir, sha256, model_slug)
+
+
+def iter_pdf_pages(file_path: str, workers: Optional[int] = None) -> Iterator[Document]:
+    """
+    Yields one Document per page, in page order, with the same {"source", "page"} metadata
+    PyPDFLoader produces (page is 0-based; citations rely on it). Large files are sharded
+    by page range across a process pool, small ones are parsed serially.
+
+    Pool workers are never forked from this process: this runs on a pipeline thread with
+    other threads (and their locks) live, which fork would copy mid-state. Shards are
+    submitted a bounded window ahead of the consumer, so closing the generator early
+    (pipeline teardown) cancels the rest instead of waiting for every shard to be parsed.
+    """
+    from pypdf import PdfReader
+
+    workers = workers or os.cpu_count() or 1
+    reader = PdfReader(file_path)
+    num_pages = len(reader.pages)
+
+    if workers <= 1 or num_pages < PARALLEL_EXTRACT_MIN_PAGES:
+        # One reader for the whole file: each PdfReader re-parses the xref/trailer.
+        for i in range(num_pages):
+            text = reader.pages[i].extract_text(extraction_mode="plain")
+            yield Document(page_content=text, metadata={"source": file_path, "page": i})
+        return
+    del reader  # workers open their own
+
+    # A few shards per worker so one slow range (scans, dense tables) doesn't stall the pool.
+    shard = max(1, -(-num_pages // (workers * 4)))
+    ranges = [(st, min(st + shard, num_pages)) for st in range(0, num_pages, shard)]
+    import multiprocessing
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    from pdf_extract import extract_page_range
+
+    # forkserver where available: workers fork from a clean server process started once,
+    # so later documents skip interpreter start-up; spawn elsewhere.
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+    pending: deque = deque()
+    try:
+        # Shards are yielded in order as they finish, so early pages flow downstream while
+        # later ones are still being parsed; two per worker keeps the pool busy.
+        for start, end in ranges:
+            pending.append(pool.submit(extract_page_range, file_path, start, end))
+            if len(pending) < workers * 2:
+                continue
+            for i, text in pending.popleft().result():
+                yield Document(page_content=text, metadata={"source": file_path, "page": i})
+        while pending:
+            for i, text in pending.popleft().result():
+                yield Document(page_content=text, metadata={"source": file_path, "page": i})
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def load_pdf_pages(file_path: str, workers: Optional[int] = None) -> List[Document]:
+    return list(iter_pdf_pages(file_path, workers=workers))
+
+
+@dataclass
+class IndexProgress:
+    pages_parsed: int = 0
+    chunks_embedded: int = 0
+    vectors_inserted: int = 0
+    done: bool = False
+
+
+class _PipelineError:
+    def __init__(self, stage: str, error: BaseException):
+        self.stage = stage
+        self.error = error
+
+
+_END = object()
+
+
+def _chunk_id(sha256: str, i: int) -> str:
+    return f"{sha256}:{i}"
+
+
+def _empty_store(embeddings: Embeddings, dim: int) -> FAISS:
+    return FAISS(embeddings, faiss.IndexFlatL2(dim), InMemoryDocstore(), {})
+
+
+def _index_params(
+    sha256: str,
+    model: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    index_spec: Optional[IndexSpec] = None,
+) -> Dict[str, Any]:
+    return {
+        "format_version": INDEX_FORMAT_VERSION,
+        "sha256": sha256,
+        "embedding_model": model,
+        "chunking": {
+            "splitter": "RecursiveCharacterTextSplitter",
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+        },
+        "index_spec": index_spec.to_dict() if index_spec else "auto",
+    }
+
+
+def _archive_params(
+    model: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    index_spec: Optional[IndexSpec] = None,
+) -> Dict[str, Any]:
+    params = _index_params("", model, chunk_size, chunk_overlap, index_spec)
+    del params["sha256"]
+    return {"kind": "archive", **params}
+
+
+class CollectionRetriever(BaseRetriever):
+    """
+    Searches a QueryAgent's documents (plus chunks still being streamed in) and keeps the
+    overall top-k by L2 distance.
+
+    Each document segment is searched separately, and a typical PDF is well under the
+    20k-chunk flat threshold, so every segment is an exact scan and the per-query cost
+    grows with the number of documents (about 78 ms for 300 segments of 500 chunks).
+    Whole-collection queries therefore search the agent's archive instead, one index
+    trained on the collection's size (see QueryAgent.compact), and fan out only over the
+    documents added since. `sha256s` restricts the search to those documents' own exact
+    segments, so a per-document query never scans the rest of the collection.
+    """
+
+    agent: Any
+    k: int = 5
+    sha256s: Optional[List[str]] = None
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        vector = self.agent.embeddings.embed_query(query)
+        scored: List[Tuple[Document, float]] = []
+        archived: FrozenSet[str] = frozenset()
+        if self.sha256s is None and self.agent.archive is not None:
+            archived = self.agent.archive_docs
+            live = [sha256 for sha256 in archived if sha256 in self.agent.segments]
+            if len(live) == len(archived):
+                scored.extend(self.agent.archive.similarity_search_with_score_by_vector(vector, k=self.k))
+            elif live:
+                # Some archived documents were removed since compaction: over-fetch and filter.
+                scored.extend(
+                    self.agent.archive.similarity_search_with_score_by_vector(
+                        vector, k=self.k, filter={"doc_sha256": live}, fetch_k=self.k * 10
+                    )
+                )
+
+        for sha256, store in self.agent.segments.items():
+            if sha256 not in archived and (self.sha256s is None or sha256 in self.sha256s):
+                scored.extend(store.similarity_search_with_score_by_vector(vector, k=self.k))
+
+        for sha256, staging in list(self.agent.staging.items()):
+            if (self.sha256s is None or sha256 in self.sha256s) and staging.index.ntotal:
+                scored.extend(staging.similarity_search_with_score_by_vector(vector, k=self.k))
+
+        scored.sort(key=lambda pair: pair[1])
+        return [doc for doc, _ in scored[: self.k]]
+
+
 class QueryAgent:
-    def __init__(self):
-        # You can keep gpt-4o-mini here; requirement only mandates GPT-5-mini for Agent A.
-        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-        self.vectorstore = None
+    def __init__(
+        self,
+        embeddings: Optional[Embeddings] = None,
+        index_dir: str = INDEX_DIR,
+        chunk_size: int = CHUNK_SIZE,
+        chunk_overlap: int = CHUNK_OVERLAP,
+        embedding_cache_path: Optional[str] = EMBED_CACHE_PATH,
+        embedding_cache_max_bytes: int = DEFAULT_MAX_BYTES,
+        extract_workers: Optional[int] = None,
+        embedding_backend: Optional[str] = None,
+        llm_backend: Optional[str] = None,
+        mmap_indexes: bool = True,
+        index_spec: Optional[IndexSpec] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        compact_after: Optional[int] = COMPACT_AFTER,
+    ):
+        _setup_runtime()
+        # Backends come from backends.py (env AGENT_B_LLM / AGENT_B_EMBEDDINGS, default "openai":
+        # gpt-4o-mini + the batched embedding executor).
+        self.llm = get_llm(llm_backend)
+        self.embeddings = embeddings or get_embeddings(embedding_backend)
+        # Chunk-level cache: revisions of a document only pay for the chunks that changed.
+        # Pass embedding_cache_path=None to disable.
+        if embedding_cache_path:
+            cache = EmbeddingCache(embedding_cache_path, max_bytes=embedding_cache_max_bytes)
+            self.embeddings = CachedEmbeddings(self.embeddings, cache)
+        self.index_dir = index_dir
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.extract_workers = extract_workers
+        # Persisted indexes are memory-mapped read-only, so every Agent B process on the
+        # host shares one page-cache copy of the vectors.
+        self.mmap_indexes = mmap_indexes
+        # None = choose by chunk count (index_store.choose_index_spec: exact up to 20k chunks,
+        # IVF-Flat up to 1M, IVF-PQ beyond), per document for segments and over the whole
+        # collection for the archive.
+        # nprobe / ef_search trade recall for latency on approximate indexes.
+        self.index_spec = index_spec
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        # Persisted documents are compacted into one archive index once this many (and
+        # at least as many as it holds) are outside it; None = only on compact().
+        self.compact_after = compact_after
+        self.archive: Optional[FAISS] = None
+        self.archive_docs: FrozenSet[str] = frozenset()
+        # sha256 -> in-RAM staging store of a document still being streamed in; the one
+        # copy of its chunks until it is persisted and replaced by its segment.
+        self.staging: Dict[str, FAISS] = {}
         self.qa_chain = None
+        # sha256 -> document info / read-only persisted segment
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.segments: Dict[str, FAISS] = {}
 
-    def load_handoff(self, handoff_path: str = HANDOFF_PATH) -> Dict[str, Any]:
+    def load_handoff(self, handoff_path: str = HANDOFF_PATH, require_file: bool = True) -> Dict[str, Any]:
+        """
+        Reads and validates a handoff. require_file=False skips the check that the PDF is
+        still on disk (opening a persisted index never reads it).
+        """
         if not os.path.exists(handoff_path):
             raise FileNotFoundError(f"handoff.json not found at: {handoff_path}")
         with open(handoff_path, "r", encoding="utf-8") as f:
@@ -59,39 +334,419 @@ class QueryAgent:
                 raise ValueError(f"handoff.json missing required field: {k}")
 
         file_path = data["file_path"]
-        if not file_path or not os.path.exists(file_path):
+        if require_file and (not file_path or not os.path.exists(file_path)):
             raise ValueError(f"Invalid file_path in handoff.json: {file_path}")
 
         return data
 
-    def index_document_from_handoff(self, handoff: Dict[str, Any]) -> None:
+    def _index_location(self, sha256: str) -> Tuple[str, Dict[str, Any]]:
+        model = _embedding_model_name(self.embeddings)
+        params = _index_params(sha256, model, self.chunk_size, self.chunk_overlap, self.index_spec)
+        return _index_path(self.index_dir, sha256, model), params
+
+    def _archive_location(self) -> Tuple[str, Dict[str, Any]]:
+        model = _embedding_model_name(self.embeddings)
+        params = _archive_params(model, self.chunk_size, self.chunk_overlap, self.index_spec)
+        return _index_path(self.index_dir, ARCHIVE_DIR_NAME, model), params
+
+    def _open_segment(self, index_path: str, params: Dict[str, Any]) -> Optional[FAISS]:
+        return load_index(
+            index_path,
+            params,
+            self.embeddings,
+            mmap=self.mmap_indexes,
+            nprobe=self.nprobe,
+            ef_search=self.ef_search,
+        )
+
+    def _load_document_index(self, handoff: Dict[str, Any]) -> Optional[FAISS]:
+        """
+        Persisted index for the handoff's PDF, if one exists for this sha256, embedding
+        model and chunking setup.
+        """
+        sha256 = handoff["sha256"]
+        model = _embedding_model_name(self.embeddings)
+        index_path, params = self._index_location(sha256)
+
+        t0 = time.time()
+        store = self._open_segment(index_path, params)
+        if store is not None:
+            logger.info(
+                f"Agent B: Loaded persisted index for sha256={sha256[:12]} "
+                f"model={model} in {(time.time() - t0) * 1000:.0f} ms"
+            )
+        return store
+
+    def _stream_document_index(
+        self,
+        handoff: Dict[str, Any],
+        progress: Optional[Callable[[IndexProgress], None]] = None,
+    ) -> FAISS:
+        """
+        Extract -> chunk -> embed -> insert as a pipeline of threads joined by bounded
+        queues. Each embedded batch is appended to the collection as soon as it arrives,
+        so the document becomes queryable (e.g. from `progress`) before parsing finishes.
+        Once complete the staging store is persisted, and swapped for the persisted
+        segment, which is returned.
+        """
         file_path = handoff["file_path"]
-        logger.info(f"Agent B: Loading PDF: {file_path}")
+        sha256 = handoff["sha256"]
+        logger.info(f"Agent B: Streaming PDF into index: {file_path}")
+
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+        splitter = RecursiveCharacterTextSplitter(chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap)
+        state = IndexProgress()
+        page_q: "queue.Queue[Any]" = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE * EMBED_BATCH_SIZE)
+        batch_q: "queue.Queue[Any]" = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        insert_q: "queue.Queue[Any]" = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        stop = threading.Event()
+
+        def _put(q: "queue.Queue[Any]", item: Any) -> bool:
+            # Blocking put that gives up once the pipeline is being torn down.
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.2)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def _get(q: "queue.Queue[Any]") -> Any:
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+            return _END
+
+        def _extract():
+            try:
+                # closing(): on teardown the page generator cancels its unparsed shards now.
+                with closing(iter_pdf_pages(file_path, workers=self.extract_workers)) as pages:
+                    for page in pages:
+                        state.pages_parsed += 1
+                        if not _put(page_q, page):
+                            return
+                _put(page_q, _END)
+            except BaseException as e:
+                _put(page_q, _PipelineError("extract", e))
+
+        def _chunk():
+            try:
+                n = 0
+                batch: List[Tuple[str, Document]] = []
+                while True:
+                    item = _get(page_q)
+                    if item is _END or isinstance(item, _PipelineError):
+                        break
+                    for d in splitter.split_documents([item]):
+                        d.metadata["doc_sha256"] = sha256
+                        d.metadata["file_name"] = handoff.get("file_name")
+                        # Stable chunk ids let the collection delete a document's vectors later.
+                        batch.append((_chunk_id(sha256, n), d))
+                        n += 1
+                        if len(batch) >= EMBED_BATCH_SIZE:
+                            if not _put(batch_q, batch):
+                                return
+                            batch = []
+                if batch:
+                    _put(batch_q, batch)
+                _put(batch_q, item)
+            except BaseException as e:
+                _put(batch_q, _PipelineError("chunk", e))
+
+        def _embed():
+            try:
+                while True:
+                    item = _get(batch_q)
+                    if item is _END or isinstance(item, _PipelineError):
+                        break
+                    vectors = self.embeddings.embed_documents([d.page_content for _, d in item])
+                    state.chunks_embedded += len(item)
+                    if not _put(insert_q, (item, vectors)):
+                        return
+                _put(insert_q, item)
+            except BaseException as e:
+                _put(insert_q, _PipelineError("embed", e))
+
+        workers = [
+            threading.Thread(target=fn, name=f"agent_b-{fn.__name__.strip('_')}", daemon=True)
+            for fn in (_extract, _chunk, _embed)
+        ]
+        for w in workers:
+            w.start()
+
+        store: Optional[FAISS] = None
+        try:
+            # Inserts stay on the calling thread: FAISS indexes are single-writer.
+            while True:
+                item = insert_q.get()
+                if item is _END:
+                    break
+                if isinstance(item, _PipelineError):
+                    raise RuntimeError(f"Index pipeline failed during {item.stage}: {item.error!r}") from item.error
+
+                batch, vectors = item
+                ids = [cid for cid, _ in batch]
+                texts = [d.page_content for _, d in batch]
+                metas = [d.metadata for _, d in batch]
+                if store is None:
+                    store = _empty_store(self.embeddings, len(vectors[0]))
+                    self.staging[sha256] = store
+                    if self.qa_chain is None:
+                        self.qa_chain = self._build_qa_chain()
+                store.add_embeddings(zip(texts, vectors), metadatas=metas, ids=ids)
+
+                state.vectors_inserted += len(ids)
+                if progress:
+                    progress(state)
+        except BaseException:
+            stop.set()
+            self._unstage(sha256)
+            raise
+        finally:
+            stop.set()
+            for w in workers:
+                w.join(timeout=5)
+
+        if store is None:
+            raise ValueError(f"No text could be extracted from {file_path}")
+
+        state.done = True
+        if progress:
+            progress(state)
+        logger.info(
+            f"Agent B: Indexed {state.pages_parsed} pages -> {state.vectors_inserted} chunks."
+        )
+        self._log_embedding_cache_stats()
+
+        index_path, params = self._index_location(sha256)
+        t0 = time.time()
+        spec = save_index(index_path, params, store, spec=self.index_spec)
+        logger.info(f"Agent B: Persisted {spec.kind} index -> {index_path} ({time.time() - t0:.2f}s)")
 
-        loader = PyPDFLoader(file_path)
-        docs = loader.load_and_split()
+        segment = self._open_segment(index_path, params)
+        self._unstage(sha256)
+        return segment if segment is not None else store
 
-        logger.info(f"Agent B: Loaded {len(docs)} chunks. Building embeddings + FAISS index...")
-        embeddings = OpenAIEmbeddings()
-        self.vectorstore = FAISS.from_documents(docs, embeddings)
+    def _unstage(self, sha256: str) -> None:
+        self.staging.pop(sha256, None)
+        if not self.documents and not self.staging:
+            self.qa_chain = None
 
-        retriever = self.vectorstore.as_retriever(search_kwargs={"k": 5})
+    def add_document(
+        self,
+        handoff: Dict[str, Any],
+        progress: Optional[Callable[[IndexProgress], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Adds one document to the collection, appending its vectors to the shared index.
+        No-op if a document with the same sha256 is already loaded.
+        `progress` is called on this thread after every inserted batch.
+        """
+        sha256 = handoff["sha256"]
+        if sha256 in self.documents:
+            logger.info(f"Agent B: Document sha256={sha256[:12]} already indexed; skipping.")
+            return self.documents[sha256]
 
-        self.qa_chain = RetrievalQA.from_chain_type(
+        store = self._load_document_index(handoff)
+        if store is None:
+            store = self._stream_document_index(handoff, progress=progress)
+        return self._register_segment(sha256, store, handoff)
+
+    def _register_segment(self, sha256: str, store: FAISS, handoff: Dict[str, Any]) -> Dict[str, Any]:
+        self.segments[sha256] = store
+        info = {
+            "sha256": sha256,
+            "file_name": handoff.get("file_name"),
+            "file_path": handoff.get("file_path"),
+            "source_url": handoff.get("source_url"),
+            "chunks": store.index.ntotal,
+            "added_at_iso": datetime.now(timezone.utc).isoformat(),
+        }
+        self.documents[sha256] = info
+        self.qa_chain = self._build_qa_chain()
+        logger.info(
+            f"Agent B: Added document {info['file_name']} ({info['chunks']} chunks). "
+            f"Collection: {len(self.documents)} documents, {self.vector_count()} vectors."
+        )
+        if self.compact_after and len(self._uncompacted()) >= max(self.compact_after, len(self.archive_docs)):
+            self.compact()
+        return info
+
+    def _uncompacted(self) -> Dict[str, FAISS]:
+        return {
+            sha256: store
+            for sha256, store in self.segments.items()
+            if sha256 not in self.archive_docs and isinstance(store.docstore, SQLiteDocstore)
+        }
+
+    def compact(self, spec: Optional[IndexSpec] = None) -> Dict[str, Any]:
+        """
+        Rebuilds the archive from every persisted segment in the collection: one index
+        over all their chunks, its type chosen by the collection's total size (so a
+        trained IVF / IVF-PQ once it outgrows an exact scan), replacing the per-document
+        fan-out for whole-collection queries. Segments stay open for per-document queries.
+        """
+        persisted = {s: store for s, store in self.segments.items() if isinstance(store.docstore, SQLiteDocstore)}
+        if not persisted:
+            return {"documents": 0, "chunks": 0}
+        path, params = self._archive_location()
+        t0 = time.time()
+        spec = build_archive(path, params, persisted, spec or self.index_spec)
+        archive = self._open_segment(path, params)
+        if archive is None:
+            raise RuntimeError(f"Archive at {path} could not be reopened after compaction.")
+        self._set_archive(archive, frozenset(persisted))
+        stats = {
+            "documents": len(persisted),
+            "chunks": archive.index.ntotal,
+            "index_spec": spec.to_dict(),
+            "seconds": round(time.time() - t0, 3),
+        }
+        logger.info(f"Agent B: Compacted collection into archive: {stats}")
+        return stats
+
+    def open_archive(self) -> Dict[str, Any]:
+        """
+        Opens the persisted archive for the current embedding model and chunking setup
+        and every document it covers, so a restarted agent searches the whole collection
+        with one index. Archived documents whose segment is gone are skipped (and filtered
+        out of archive results). Raises FileNotFoundError when there is no usable archive.
+        """
+        path, params = self._archive_location()
+        archive = self._open_segment(path, params)
+        meta = read_index_meta(path) if archive is not None else None
+        if archive is None or meta is None:
+            raise FileNotFoundError(f"No usable archive under {path}; build one with compact().")
+        self._set_archive(archive, frozenset(meta["documents"]))
+        for sha256 in meta["documents"]:
+            try:
+                self.open_document(sha256)
+            except FileNotFoundError:
+                logger.info(f"Agent B: Archived document sha256={sha256[:12]} has no segment; skipping.")
+        return {"documents": len(self.documents), "chunks": archive.index.ntotal}
+
+    def _set_archive(self, archive: FAISS, documents: FrozenSet[str]) -> None:
+        previous, self.archive, self.archive_docs = self.archive, archive, documents
+        if previous is not None:
+            close_index(previous)
+
+    def resolve_sha256(self, prefix: str) -> str:
+        """Full sha256 of the persisted document whose hash starts with `prefix`."""
+        prefix = prefix.strip().lower()
+        # Checked before it is joined to a path: "" would name index_dir, ".." its parent.
+        if not re.fullmatch(r"[0-9a-f]{1,64}", prefix):
+            raise ValueError(f"Not a sha256 or sha256 prefix (1-64 hex digits): {prefix!r}")
+        if len(prefix) == 64 and os.path.isdir(os.path.join(self.index_dir, prefix)):
+            return prefix
+        try:
+            names = os.listdir(self.index_dir)
+        except FileNotFoundError:
+            names = []
+        matches = [n for n in names if len(n) == 64 and n.startswith(prefix)]
+        if len(matches) > 1:
+            raise ValueError(f"sha256 prefix {prefix!r} is ambiguous: {', '.join(m[:12] for m in matches)}")
+        if not matches:
+            raise FileNotFoundError(f"No persisted index for sha256 {prefix!r} under {self.index_dir}")
+        return matches[0]
+
+    def open_document(self, sha256: str, handoff: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Adds a document from its persisted segment only: nothing is extracted or embedded,
+        so a query session on an already-processed document costs one index open.
+        `sha256` may be a unique prefix; without a handoff, name and path come from the
+        stored chunk metadata. Raises FileNotFoundError when no index matches the current
+        embedding model and chunking setup.
+        """
+        sha256 = self.resolve_sha256(sha256)
+        if sha256 in self.documents:
+            return self.documents[sha256]
+        store = self._load_document_index({"sha256": sha256})
+        if store is None:
+            model = _embedding_model_name(self.embeddings)
+            raise FileNotFoundError(
+                f"No usable persisted index for sha256={sha256[:12]} (model={model}, "
+                f"chunk_size={self.chunk_size}); index it first (main.py --url / --handoff)."
+            )
+        if handoff is None:
+            first = store.docstore.search(store.index_to_docstore_id[0]) if store.index.ntotal else None
+            meta = first.metadata if isinstance(first, Document) else {}
+            handoff = {"file_name": meta.get("file_name"), "file_path": meta.get("source")}
+        return self._register_segment(sha256, store, handoff)
+
+    def remove_document(self, sha256: str) -> bool:
+        if sha256 not in self.documents:
+            return False
+        close_index(self.segments.pop(sha256))
+        info = self.documents.pop(sha256)
+        if not self.documents and not self.staging:
+            self.qa_chain = None
+        logger.info(f"Agent B: Removed document {info['file_name']} (sha256={sha256[:12]}).")
+        return True
+
+    def list_documents(self) -> List[Dict[str, Any]]:
+        return list(self.documents.values())
+
+    def vector_count(self) -> int:
+        staged = sum(store.index.ntotal for store in self.staging.values())
+        return staged + sum(store.index.ntotal for store in self.segments.values())
+
+    def index_document_from_handoff(
+        self,
+        handoff: Dict[str, Any],
+        progress: Optional[Callable[[IndexProgress], None]] = None,
+    ) -> None:
+        self.add_document(handoff, progress=progress)
+        logger.info("Agent B: Indexing complete. Ready for queries.")
+
+    def _build_qa_chain(self, sha256s: Optional[List[str]] = None):
+        from langchain.chains import RetrievalQA
+        from langchain.prompts import PromptTemplate
+
+        retriever = CollectionRetriever(agent=self, k=5, sha256s=sha256s)
+
+        return RetrievalQA.from_chain_type(
             llm=self.llm,
             chain_type="stuff",
             retriever=retriever,
             return_source_documents=True,
-            chain_type_kwargs={"prompt": GUARDED_QA_PROMPT},
+            chain_type_kwargs={
+                "prompt": PromptTemplate(input_variables=["context", "question"], template=GUARDED_QA_TEMPLATE)
+            },
         )
 
-        logger.info("Agent B: Indexing complete. Ready for queries.")
+    def _log_embedding_cache_stats(self) -> None:
+        backend = self.embeddings
+        if isinstance(backend, CachedEmbeddings):
+            stats = backend.cache.stats()
+            logger.info(
+                f"Agent B: Embedding cache hits={backend.hits} misses={backend.misses} "
+                f"entries={stats['entries']} bytes={stats['bytes']}/{stats['max_bytes']}"
+            )
+            backend = backend.underlying
+        # Duck-typed so the OpenAI executor (and openai itself) is only imported when selected.
+        if callable(getattr(backend, "stats_snapshot", None)):
+            logger.info(f"Agent B: Embedding executor stats: {backend.stats_snapshot()}")
 
-    def query(self, question: str) -> Dict[str, Any]:
+    def query(self, question: str, sha256: Optional[Union[str, List[str]]] = None) -> Dict[str, Any]:
+        """
+        Answers from the whole collection, or only from the given document(s) when
+        sha256 is set.
+        """
         if not self.qa_chain:
             return {"answer": "System: No document indexed.", "sources": []}
 
-        result = self.qa_chain.invoke({"query": question})
+        qa_chain = self.qa_chain
+        if sha256 is not None:
+            wanted = [sha256] if isinstance(sha256, str) else list(sha256)
+            missing = [h for h in wanted if h not in self.documents]
+            if missing:
+                return {"answer": f"System: Document not indexed: {', '.join(missing)}", "sources": []}
+            qa_chain = self._build_qa_chain(sha256s=wanted)
+
+        result = qa_chain.invoke({"query": question})
         answer = result.get("result", "")
 
         # Collect simple citations (page numbers) from source docs
@@ -100,7 +755,7 @@ class QueryAgent:
             meta = d.metadata or {}
             page = meta.get("page", None)
             src = meta.get("source", None)
-            sources.append({"page": page, "source": src})
+            sources.append({"page": page, "source": src, "sha256": meta.get("doc_sha256")})
 
         # De-dup
         seen = set()
@@ -115,10 +770,44 @@ class QueryAgent:
         return {"answer": answer, "sources": uniq}
 
 
+def open_query_session(
+    sha256: Optional[str] = None,
+    handoff_path: Optional[str] = None,
+    backend: Optional[str] = None,
+) -> QueryAgent:
+    """
+    QueryAgent with one already-processed document opened from its persisted index, by
+    sha256 (or unique prefix) or by handoff path. A handoff whose document has no usable
+    index yet (new model or chunking) is indexed from its PDF; a bare sha256 cannot be.
+    """
+    t0 = time.time()
+    agent = QueryAgent(embedding_backend=backend, llm_backend=backend)
+    handoff = agent.load_handoff(handoff_path, require_file=False) if handoff_path else None
+    try:
+        agent.open_document(sha256 or handoff["sha256"], handoff=handoff)
+    except FileNotFoundError:
+        if handoff is None:
+            raise
+        agent.index_document_from_handoff(agent.load_handoff(handoff_path))
+    logger.info(f"Agent B: Query session ready in {(time.time() - t0) * 1000:.0f} ms.")
+    return agent
+
+
 def run_cli():
-    agent = QueryAgent()
-    handoff = agent.load_handoff()
-    agent.index_document_from_handoff(handoff)
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Query a processed document without running Agent A.")
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--sha256", help="Document hash (or unique prefix) of a persisted index.")
+    src.add_argument("--handoff", default=HANDOFF_PATH, help=f"Handoff JSON (default: {HANDOFF_PATH}).")
+    ap.add_argument("--offline", action="store_true", help="Use local embedding/LLM backends (no API calls).")
+    args = ap.parse_args()
+
+    agent = open_query_session(
+        sha256=args.sha256,
+        handoff_path=None if args.sha256 else args.handoff,
+        backend="local" if args.offline else None,
+    )
 
     print("\nAgent B: Document is queryable. Ask questions. Type 'exit' to quit.\n")
     while True:
@@ -0,0 +1,146 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from agent_a import DOWNLOADS_DIR, DownloadAgent, HandoffPayload, SANDBOX_DIR, setup_runtime
+from blob_store import BlobStore
+from browser_pool import BrowserPool
+
+logger = logging.getLogger("agent_a")
+
+BATCH_HANDOFFS_PATH = os.path.join(SANDBOX_DIR, "batch_handoffs.jsonl")
+
+
+def load_batch_urls(path: str) -> List[str]:
+    """
+    One URL per line, or JSONL objects carrying "url" / "source_url" (so a previous
+    batch_handoffs.jsonl can be replayed). Blank lines and '#' comments are skipped;
+    duplicates are dropped, first occurrence wins.
+    """
+    urls: List[str] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                rec = json.loads(line)
+                url = rec.get("url") or rec.get("source_url")
+                if not url:
+                    raise ValueError(f"{path}:{n}: JSON record has no 'url' or 'source_url'.")
+            else:
+                url = line
+            urls.append(url)
+    return list(dict.fromkeys(urls))
+
+
+def _failed_record(url: str, error: str, elapsed_s: float) -> Dict[str, Any]:
+    payload = HandoffPayload(
+        status="failed",
+        file_path="",
+        file_name="",
+        source_url=url,
+        sha256="",
+        bytes=0,
+        downloaded_at_iso=datetime.now(timezone.utc).isoformat(),
+        notes=error,
+        extra={"elapsed_s": round(elapsed_s, 3)},
+    )
+    return asdict(payload)
+
+
+def _percentile(xs: List[float], p: int) -> float:
+    if not xs:
+        return 0.0
+    xs = sorted(xs)
+    return xs[max(0, -(-p * len(xs) // 100) - 1)]
+
+
+async def run_batch(
+    urls: List[str],
+    concurrency: int = 4,
+    deadline_s: float = 600,
+    out_path: str = BATCH_HANDOFFS_PATH,
+    planner: Optional[str] = None,
+    pool: Optional[BrowserPool] = None,
+    browser_profile: Optional[str] = None,
+    force_refresh: bool = False,
+) -> Dict[str, Any]:
+    """
+    Downloads every URL with at most `concurrency` in flight over one shared browser pool.
+    Each URL gets `deadline_s` (retries included); URLs in the download manifest are
+    answered from it unless force_refresh. One handoff record per URL is appended
+    to out_path as it finishes (after any earlier runs' records), so a partial batch
+    still leaves its results behind.
+    Returns an aggregate report (throughput, latency percentiles, per-URL timings).
+    """
+    # Before the pool reads AGENT_A_BROWSER_PROFILE: .env is loaded by agent_a's setup.
+    setup_runtime()
+    owns_pool = pool is None
+    pool = pool or BrowserPool(
+        size=1,
+        contexts_per_browser=concurrency,
+        profile=browser_profile,
+        downloads_path=BlobStore(DOWNLOADS_DIR).incoming_dir,
+    )
+    agent = DownloadAgent(planner=planner, pool=pool)
+    sem = asyncio.Semaphore(concurrency)
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    timings: List[Dict[str, Any]] = []
+
+    # Append: earlier batches' records stay, and a crash mid-batch loses nothing written.
+    with open(out_path, "a", encoding="utf-8") as out:
+
+        async def _one(url: str) -> None:
+            async with sem:
+                t0 = time.perf_counter()
+                try:
+                    rec = await asyncio.wait_for(
+                        agent.run(url, max_seconds=deadline_s, write_handoff=False, force_refresh=force_refresh), timeout=deadline_s
+                    )
+                    elapsed = time.perf_counter() - t0
+                    rec["extra"] = {**rec.get("extra", {}), "elapsed_s": round(elapsed, 3)}
+                except asyncio.TimeoutError:
+                    elapsed = time.perf_counter() - t0
+                    rec = _failed_record(url, f"Deadline exceeded ({deadline_s:g}s).", elapsed)
+                except Exception as e:
+                    elapsed = time.perf_counter() - t0
+                    rec = _failed_record(url, f"{type(e).__name__}: {e}", elapsed)
+                out.write(json.dumps(rec) + "\n")
+                out.flush()
+                timings.append({"url": url, "status": rec["status"], "elapsed_s": round(elapsed, 3)})
+                logger.info(f"Batch: {rec['status']} in {elapsed:.2f}s ({len(timings)}/{len(urls)}) {url}")
+
+        t0 = time.perf_counter()
+        try:
+            await asyncio.gather(*[_one(u) for u in urls])
+        finally:
+            manifest_stats = agent.manifest.stats() if agent.manifest else None
+            await agent.close()
+            if owns_pool:
+                await pool.close()
+        wall = time.perf_counter() - t0
+
+    ok = [t["elapsed_s"] for t in timings if t["status"] == "success"]
+    report = {
+        "urls": len(urls),
+        "succeeded": len(ok),
+        "failed": len(timings) - len(ok),
+        "concurrency": concurrency,
+        "wall_s": round(wall, 2),
+        "downloads_per_min": round(len(ok) / wall * 60, 2) if wall else 0.0,
+        "latency_s": {f"p{p}": _percentile(ok, p) for p in (50, 95, 99)},
+        "handoffs_path": out_path,
+        "manifest": manifest_stats,
+        "per_url": timings,
+    }
+    logger.info(
+        f"Batch done: {report['succeeded']}/{report['urls']} ok in {report['wall_s']}s "
+        f"({report['downloads_per_min']} downloads/min)"
+    )
+    return report
@@ -0,0 +1,105 @@
+"""
+Recall vs latency of the approximate index types Agent B can persist (index_store.IndexSpec)
+against the exact flat baseline, on clustered synthetic vectors.
+
+    python bench/bench_ann_recall.py --vectors 200000 --dim 256 --queries 500
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import faiss  # noqa: E402
+import numpy as np  # noqa: E402
+
+from bench.common import percentiles  # noqa: E402
+from index_store import IndexSpec, build_faiss_index, apply_search_params, choose_index_spec, read_faiss_index  # noqa: E402
+
+
+def clustered(n: int, dim: int, clusters: int, rng) -> np.ndarray:
+    # Embeddings of real chunks cluster by topic; uniform noise would flatter nothing.
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    x = centers[rng.integers(0, clusters, size=n)] + 0.35 * rng.normal(size=(n, dim)).astype(np.float32)
+    return np.ascontiguousarray(x, dtype=np.float32)
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = sum(len(set(f[f >= 0]).intersection(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def measure(index, queries: np.ndarray, truth: np.ndarray, k: int) -> dict:
+    latencies = []
+    found = np.empty((len(queries), k), dtype=np.int64)
+    for i, q in enumerate(queries):
+        t0 = time.perf_counter()
+        _, ids = index.search(q[None, :], k)
+        latencies.append(time.perf_counter() - t0)
+        found[i] = ids[0]
+    return {"recall_at_k": round(recall_at_k(found, truth), 4), "latency_ms": percentiles(latencies)}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--vectors", type=int, default=200_000)
+    ap.add_argument("--dim", type=int, default=256)
+    ap.add_argument("--queries", type=int, default=500)
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64])
+    ap.add_argument("--ef-search", type=int, nargs="+", default=[16, 32, 64, 128])
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = clustered(args.vectors + args.queries, args.dim, clusters=max(16, args.vectors // 2000), rng=rng)
+    base, queries = data[: args.vectors], data[args.vectors:]
+
+    flat = faiss.IndexFlatL2(args.dim)
+    flat.add(base)
+    _, truth = flat.search(queries, args.k)
+
+    specs = {
+        "flat": (IndexSpec(kind="flat"), {}),
+        "ivfflat": (IndexSpec(kind="ivfflat"), {"nprobe": args.nprobe}),
+        "hnsw": (IndexSpec(kind="hnsw"), {"ef_search": args.ef_search}),
+        "ivfpq": (IndexSpec(kind="ivfpq"), {"nprobe": args.nprobe}),
+    }
+    report = {
+        "vectors": args.vectors,
+        "dim": args.dim,
+        "k": args.k,
+        "auto_spec": choose_index_spec(args.vectors, args.dim).to_dict(),
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (spec, sweeps) in specs.items():
+            t0 = time.perf_counter()
+            index, resolved = build_faiss_index(base, spec)
+            build_s = time.perf_counter() - t0
+            path = os.path.join(tmp, f"{name}.faiss")
+            faiss.write_index(index, path)
+            index = read_faiss_index(path)  # same load path as Agent B (mmap when supported)
+
+            entry = {
+                "kind": name,
+                "spec": resolved.to_dict(),
+                "build_s": round(build_s, 2),
+                "index_bytes": os.path.getsize(path),
+                "sweep": [],
+            }
+            if not sweeps:
+                entry["sweep"].append(measure(index, queries, truth, args.k))
+            for knob, values in sweeps.items():
+                for v in values:
+                    apply_search_params(index, **{knob: v})
+                    entry["sweep"].append({knob: v, **measure(index, queries, truth, args.k)})
+            report["results"].append(entry)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
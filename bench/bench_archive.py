@@ -0,0 +1,125 @@
+"""
+Whole-collection query latency with many small documents: the per-document segment
+fan-out (each segment is under the flat threshold, so one exact scan per document) vs
+the compacted archive (one index trained on the collection size). Recall is measured
+against the fan-out, which is exact.
+
+Segments are written as Agent B persists them (index_store.save_index, opened through
+QueryAgent.open_document); vectors are clustered synthetic ones, not embedded text.
+
+    python bench/bench_archive.py --segments 300 --chunks 500 --dim 256
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import tempfile
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import faiss  # noqa: E402
+import numpy as np  # noqa: E402
+from langchain_community.docstore.in_memory import InMemoryDocstore  # noqa: E402
+from langchain_community.vectorstores import FAISS  # noqa: E402
+from langchain_core.embeddings import Embeddings  # noqa: E402
+
+from agent_b import CollectionRetriever, QueryAgent, _chunk_id  # noqa: E402
+from bench.bench_ann_recall import clustered  # noqa: E402
+from bench.common import percentiles  # noqa: E402
+from index_store import save_index  # noqa: E402
+
+
+class FixedQueryEmbeddings(Embeddings):
+    """Maps the query text "<i>" to the i-th precomputed query vector."""
+
+    def __init__(self, queries: np.ndarray):
+        self.model = f"bench-archive-{queries.shape[1]}"
+        self.queries = queries
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        raise NotImplementedError("bench segments are built from precomputed vectors")
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.queries[int(text)].tolist()
+
+
+def build_segments(agent: QueryAgent, vectors: np.ndarray, segments: int) -> None:
+    for seg, block in enumerate(np.array_split(vectors, segments)):
+        sha256 = hashlib.sha256(f"bench-archive-{seg}".encode()).hexdigest()
+        store = FAISS(agent.embeddings, faiss.IndexFlatL2(vectors.shape[1]), InMemoryDocstore(), {})
+        metadatas = [{"doc_sha256": sha256, "page": i // 4, "source": f"doc{seg}.pdf"} for i in range(len(block))]
+        store.add_embeddings(
+            zip([f"doc {seg} chunk {i}" for i in range(len(block))], block.tolist()),
+            metadatas=metadatas,
+            ids=[_chunk_id(sha256, i) for i in range(len(block))],
+        )
+        path, params = agent._index_location(sha256)
+        save_index(path, params, store)
+        agent.open_document(sha256)
+
+
+def run_queries(retriever: CollectionRetriever, n: int):
+    latencies, found = [], []
+    for i in range(n):
+        t0 = time.perf_counter()
+        docs = retriever.invoke(str(i))
+        latencies.append(time.perf_counter() - t0)
+        found.append([d.page_content for d in docs])
+    return latencies, found
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--segments", type=int, default=300)
+    ap.add_argument("--chunks", type=int, default=500, help="chunks per document")
+    ap.add_argument("--dim", type=int, default=256)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--k", type=int, default=5)
+    args = ap.parse_args()
+
+    n = args.segments * args.chunks
+    rng = np.random.default_rng(0)
+    data = clustered(n + args.queries, args.dim, clusters=max(16, n // 2000), rng=rng)
+    vectors, queries = data[:n], data[n:]
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench_archive_") as tmp:
+        os.chdir(tmp)  # QueryAgent sets up sandbox/logs relative to the cwd
+        agent = QueryAgent(
+            embeddings=FixedQueryEmbeddings(queries),
+            index_dir=os.path.join(tmp, "indexes"),
+            embedding_cache_path=None,
+            llm_backend="local",
+            compact_after=None,
+        )
+        t0 = time.perf_counter()
+        build_segments(agent, vectors, args.segments)
+        build_s = time.perf_counter() - t0
+
+        retriever = CollectionRetriever(agent=agent, k=args.k)
+        fanout_lat, truth = run_queries(retriever, args.queries)
+
+        compaction = agent.compact()
+        archive_lat, found = run_queries(retriever, args.queries)
+
+        hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+        report = {
+            "segments": args.segments,
+            "chunks_per_segment": args.chunks,
+            "dim": args.dim,
+            "k": args.k,
+            "segments_build_s": round(build_s, 2),
+            "compaction": compaction,
+            "fanout_latency_ms": percentiles(fanout_lat),
+            "archive_latency_ms": percentiles(archive_lat),
+            "archive_recall_at_k": round(hits / (args.queries * args.k), 4),
+        }
+        os.chdir(cwd)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Per-download latency of Agent A with a shared BrowserPool vs a browser launched per run
+(recycle_after=1), against the local fixture server (bench/fixture_server.py) with the
+offline planner. Needs a Playwright Chromium install.
+
+    python bench/bench_browser_pool.py --downloads 20 --concurrency 1 4
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.common import browser_skip, percentiles, current_rss_mb  # noqa: E402
+from bench.fixture_server import start_fixture_server  # noqa: E402
+
+async def run_mode(url: str, downloads: int, concurrency: int, recycle_after: int) -> dict:
+    from agent_a import DownloadAgent
+    from browser_pool import BrowserPool
+
+    pool = BrowserPool(size=1, contexts_per_browser=concurrency, recycle_after=recycle_after, profile="headless")
+    agent = DownloadAgent(planner="local", pool=pool)
+    sem = asyncio.Semaphore(concurrency)
+    latencies, errors = [], []
+
+    async def _one():
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                await agent.run(url, max_seconds=120)
+                latencies.append(time.perf_counter() - t0)
+            except Exception as e:
+                errors.append(e)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*[_one() for _ in range(downloads)])
+    wall = time.perf_counter() - t0
+    rss = current_rss_mb()
+    await pool.close()
+    if errors and not pool.stats["launches"]:
+        raise errors[0]  # no browser at all (e.g. Chromium not installed)
+    return {
+        "recycle_after": recycle_after,
+        "concurrency": concurrency,
+        "downloads": downloads,
+        "failures": len(errors),
+        "wall_s": round(wall, 2),
+        "latency_ms": percentiles(latencies),
+        "pool_stats": dict(pool.stats),
+        "driver_rss_mb": rss,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--downloads", type=int, default=20)
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 4])
+    args = ap.parse_args()
+
+    server, state, base = start_fixture_server()
+    url = f"{base}/drive_viewer.html"
+    results = []
+    try:
+        for c in args.concurrency:
+            for recycle_after in (1, 1_000_000):  # launch-per-run vs long-lived
+                results.append(asyncio.run(run_mode(url, args.downloads, c, recycle_after)))
+    except Exception as e:
+        results.append(browser_skip(e))
+    finally:
+        server.shutdown()
+    print(json.dumps({"url": url, "results": results, "fixture_hits": dict(state.hits)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
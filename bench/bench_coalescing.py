@@ -0,0 +1,73 @@
+"""
+Single-flight coalescing in Agent A: N concurrent DownloadAgent.run calls for the same
+URL against the local fixture server, counting how many times the page and the PDF were
+actually fetched and whether every caller got the same sha256; exits non-zero unless
+the page and the PDF were fetched exactly once and there is a single sha256. Manifest
+disabled so only coalescing is measured. Needs a Playwright Chromium install (reported
+as skipped otherwise; any other error fails the run).
+
+    python bench/bench_coalescing.py --callers 8
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.common import browser_skip  # noqa: E402
+from bench.fixture_server import start_fixture_server  # noqa: E402
+
+
+async def run(url: str, callers: int) -> dict:
+    from agent_a import DownloadAgent
+    from browser_pool import BrowserPool
+
+    pool = BrowserPool(size=1, contexts_per_browser=callers, profile="headless")
+    agent = DownloadAgent(planner="local", pool=pool, manifest_path=None)
+    try:
+        t0 = time.perf_counter()
+        results = await asyncio.gather(*[agent.run(url, max_seconds=120, write_handoff=False) for _ in range(callers)])
+        wall = time.perf_counter() - t0
+        flights = dict(agent._flights.stats)
+    finally:
+        await agent.close()
+        await pool.close()
+    return {
+        "callers": callers,
+        "wall_s": round(wall, 3),
+        "distinct_sha256": sorted({r["sha256"] for r in results}),
+        "flights": flights,
+        "browser_contexts_leased": pool.stats["leases"],
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--callers", type=int, default=8)
+    args = ap.parse_args()
+
+    server, state, base = start_fixture_server()
+    url = f"{base}/drive_viewer.html"
+    try:
+        report = asyncio.run(run(url, args.callers))
+    except Exception as e:
+        report = browser_skip(e)
+    finally:
+        server.shutdown()
+    report["fixture_fetches"] = {
+        "page": state.hits.get("/drive_viewer.html", 0),
+        "pdf": state.hits.get("/sample.pdf", 0),
+    }
+    print(json.dumps(report, indent=2))
+    if "skipped" not in report:
+        fetches = report["fixture_fetches"]
+        assert fetches["page"] == 1, f"page fetched {fetches['page']} times, expected 1"
+        assert fetches["pdf"] == 1, f"PDF fetched {fetches['pdf']} times, expected 1"
+        assert len(report["distinct_sha256"]) == 1, f"callers got {report['distinct_sha256']}"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+End-to-end latency benchmark for both agents, using the offline ("local") backends so it
+runs without network access or API keys.
+
+Agent B: per document size, index a generated PDF and replay a fixed query set, reporting
+index wall time, chunks/sec, query p50/p95/p99, peak RSS and on-disk index size. Each size
+runs in its own subprocess so peak RSS is per size, not cumulative.
+
+Agent A: times the non-network pieces (_sha256_file, placing a finished download in the
+sandbox the former way (copy, then hash pass) vs single-pass blob_store.copy_and_hash, handoff write,
+page-state collection against bench/fixtures/drive_viewer.html; the latter needs a
+Playwright Chromium install and is reported as skipped otherwise).
+
+Startup: per-module import time and `main.py --help` wall time (bench_import_time.py).
+
+    python bench/bench_e2e.py --pages 10 100 1000 --out bench_results.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.common import REPO_ROOT, FIXTURES_DIR, browser_skip, percentiles, peak_rss_mb, dir_size_bytes  # noqa: E402
+from bench.synth_pdf import make_pdf  # noqa: E402
+from bench.bench_import_time import DEFAULT_MODULES, bench_imports  # noqa: E402
+
+QUERIES = [
+    "What does the agreement say about payment terms?",
+    "When can a party terminate the agreement?",
+    "Summarise the warranty and liability clauses.",
+    "Which section covers confidential obligations?",
+    "What renewal fee applies to the service?",
+    "Is there a delivery schedule?",
+    "Who must receive notice of an amendment?",
+    "What is the invoice reference for section 2.3?",
+]
+
+
+def bench_agent_b(pages: int, repeats: int) -> dict:
+    from agent_b import QueryAgent
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = make_pdf(os.path.join(tmp, f"synthetic_{pages}.pdf"), pages)
+        index_dir = os.path.join(tmp, "indexes")
+        handoff = {
+            "file_path": pdf,
+            "file_name": os.path.basename(pdf),
+            "source_url": "bench://synthetic",
+            "sha256": f"bench-{pages}",
+        }
+
+        agent = QueryAgent(
+            embedding_backend="local",
+            llm_backend="local",
+            index_dir=index_dir,
+            embedding_cache_path=None,
+        )
+        first_queryable = []
+
+        def _progress(p):
+            if not first_queryable and p.vectors_inserted:
+                first_queryable.append(time.perf_counter())
+
+        t0 = time.perf_counter()
+        info = agent.add_document(handoff, progress=_progress)
+        index_s = time.perf_counter() - t0
+
+        # Re-open from the persisted index (fresh agent) to time the warm path.
+        t1 = time.perf_counter()
+        QueryAgent(
+            embedding_backend="local",
+            llm_backend="local",
+            index_dir=index_dir,
+            embedding_cache_path=None,
+        ).add_document(handoff)
+        reopen_s = time.perf_counter() - t1
+
+        latencies = []
+        for _ in range(repeats):
+            for q in QUERIES:
+                tq = time.perf_counter()
+                agent.query(q)
+                latencies.append(time.perf_counter() - tq)
+
+        return {
+            "pages": pages,
+            "chunks": info["chunks"],
+            "index_s": round(index_s, 3),
+            "time_to_first_queryable_s": round(first_queryable[0] - t0, 3) if first_queryable else None,
+            "reopen_persisted_s": round(reopen_s, 3),
+            "chunks_per_s": round(info["chunks"] / index_s, 1) if index_s else None,
+            "query_latency_ms": percentiles(latencies),
+            "queries": len(latencies),
+            "peak_rss_mb": peak_rss_mb(),
+            "index_bytes": dir_size_bytes(index_dir),
+        }
+
+
+def _run_isolated(pages: int, repeats: int) -> dict:
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", "--pages", str(pages), "--repeats", str(repeats)],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+async def _time_page_state(samples: int) -> dict:
+    from agent_a import _collect_page_state
+
+    try:
+        from playwright.async_api import async_playwright
+
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            page = await browser.new_page()
+            await page.goto(Path(FIXTURES_DIR, "drive_viewer.html").as_uri() + "?n=200")
+            latencies = []
+            for _ in range(samples):
+                t0 = time.perf_counter()
+                await _collect_page_state(page)
+                latencies.append(time.perf_counter() - t0)
+            await browser.close()
+        return {"latency_ms": percentiles(latencies), "samples": samples}
+    except Exception as e:
+        return browser_skip(e)
+
+
+def bench_agent_a(samples: int) -> dict:
+    from agent_a import HandoffPayload, _sha256_file
+    from blob_store import copy_and_hash
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = make_pdf(os.path.join(tmp, "hash_me.pdf"), 500)
+        size = os.path.getsize(pdf)
+        latencies = []
+        for _ in range(samples):
+            t0 = time.perf_counter()
+            sha = _sha256_file(pdf)
+            latencies.append(time.perf_counter() - t0)
+        results["sha256_file"] = {
+            "bytes": size,
+            "latency_ms": percentiles(latencies),
+            "mb_per_s": round(size / (1024 * 1024) / (sorted(latencies)[len(latencies) // 2] or 1e-9), 1),
+        }
+
+        dst = os.path.join(tmp, "placed.pdf")
+        copy_then_hash, single_pass = [], []
+        for _ in range(samples):
+            t0 = time.perf_counter()
+            shutil.copyfile(pdf, dst)  # what download.save_as does
+            os.path.getsize(dst)
+            _sha256_file(dst)
+            copy_then_hash.append(time.perf_counter() - t0)
+            os.remove(dst)
+            t0 = time.perf_counter()
+            copy_and_hash(pdf, dst)
+            single_pass.append(time.perf_counter() - t0)
+            os.remove(dst)
+        results["save_and_hash"] = {
+            "bytes": size,
+            "copy_then_hash_ms": percentiles(copy_then_hash),
+            "single_pass_ms": percentiles(single_pass),
+        }
+
+        payload = HandoffPayload(
+            status="success",
+            file_path=pdf,
+            file_name="hash_me.pdf",
+            source_url="bench://synthetic",
+            sha256=sha,
+            bytes=size,
+            downloaded_at_iso=datetime.now(timezone.utc).isoformat(),
+            notes="bench",
+            extra={},
+        )
+        latencies = []
+        for i in range(samples):
+            t0 = time.perf_counter()
+            with open(os.path.join(tmp, "handoff.json"), "w", encoding="utf-8") as f:
+                json.dump(asdict(payload), f, indent=2)
+            latencies.append(time.perf_counter() - t0)
+        results["handoff_write"] = {"latency_ms": percentiles(latencies)}
+
+    results["collect_page_state"] = asyncio.run(_time_page_state(samples))
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000])
+    ap.add_argument("--repeats", type=int, default=5, help="Passes over the fixed query set.")
+    ap.add_argument("--samples", type=int, default=20, help="Samples per Agent A micro-benchmark.")
+    ap.add_argument("--out", default=None, help="Also write the JSON report here.")
+    ap.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.worker:
+        print(json.dumps(bench_agent_b(args.pages[0], args.repeats)))
+        return
+
+    report = {
+        "generated_at_iso": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "cpu_count": os.cpu_count(),
+        "backends": {"embeddings": "local", "llm": "local"},
+        "agent_b": [_run_isolated(n, args.repeats) for n in args.pages],
+        "agent_a": bench_agent_a(args.samples),
+        "startup": bench_imports(DEFAULT_MODULES, samples=3),
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Throughput of agent B's AsyncBatchEmbeddings against the local fake embeddings endpoint
+with injected latency and 429s, across concurrency levels.
+
+    python bench/bench_embed_executor.py --chunks 512 --latency-ms 100 --fail-every 7
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding_executor import AsyncBatchEmbeddings  # noqa: E402
+from bench.fake_openai_server import start_server  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--chunks", type=int, default=512)
+    ap.add_argument("--chunk-chars", type=int, default=4000)
+    ap.add_argument("--latency-ms", type=float, default=100.0)
+    ap.add_argument("--fail-every", type=int, default=0)
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    ap.add_argument("--max-batch-tokens", type=int, default=8_000)
+    args = ap.parse_args()
+
+    texts = [(f"chunk {i} " * (args.chunk_chars // 8))[: args.chunk_chars] for i in range(args.chunks)]
+    results = []
+    for c in args.concurrency:
+        server, state, url = start_server(latency_ms=args.latency_ms, fail_every=args.fail_every)
+        try:
+            emb = AsyncBatchEmbeddings(
+                api_key="local",
+                base_url=url,
+                max_concurrency=c,
+                max_batch_tokens=args.max_batch_tokens,
+                max_attempts=10,
+            )
+            t0 = time.perf_counter()
+            vectors = emb.embed_documents(texts)
+            wall = time.perf_counter() - t0
+            assert len(vectors) == len(texts)
+            results.append({
+                "concurrency": c,
+                "wall_s": round(wall, 3),
+                "chunks_per_s": round(len(texts) / wall, 1),
+                "client": emb.stats_snapshot(),
+                "server": dict(state.counters),
+            })
+        finally:
+            server.shutdown()
+
+    print(json.dumps({"chunks": args.chunks, "latency_ms": args.latency_ms, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Startup cost of the entry points: `python -X importtime -c "import <module>"` per module in a
+fresh interpreter (cumulative import time, median over --samples, plus the heaviest
+transitive imports), the wall time of `main.py --help`, and whether importing left a
+sandbox/ directory behind (it should not: setup happens when an agent is constructed).
+
+    python bench/bench_import_time.py --samples 5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.common import REPO_ROOT  # noqa: E402
+
+DEFAULT_MODULES = ["main", "agent_a", "agent_b", "batch_download", "browser_pool", "backends", "index_store"]
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(module, self_us, cumulative_us) per line of -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure_import(module: str, cwd: str, top: int = 5) -> Dict:
+    code = f"import sys; sys.path.insert(0, {REPO_ROOT!r}); import {module}"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=cwd, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+    rows = _parse_importtime(proc.stderr)
+    total = next((cum for name, _, cum in reversed(rows) if name == module), 0)
+    # Top-level packages only (their cumulative time covers submodules), heaviest first.
+    heaviest = sorted(
+        ((name, cum) for name, _, cum in rows if name != module and "." not in name),
+        key=lambda r: -r[1],
+    )[:top]
+    return {"cumulative_ms": round(total / 1000, 1), "heaviest_ms": {n: round(c / 1000, 1) for n, c in heaviest}}
+
+
+def measure_help(cwd: str) -> float:
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(REPO_ROOT, "main.py"), "--help"], cwd=cwd, capture_output=True, check=True)
+    return time.perf_counter() - t0
+
+
+def bench_imports(modules: List[str], samples: int) -> Dict:
+    # A scratch cwd, so a module creating sandbox/ on import would be noticed.
+    with tempfile.TemporaryDirectory(prefix="bench_import_") as cwd:
+        out: Dict = {"modules": {}}
+        for module in modules:
+            runs = [measure_import(module, cwd) for _ in range(samples)]
+            if "error" in runs[0]:
+                out["modules"][module] = runs[0]
+                continue
+            out["modules"][module] = {
+                "cumulative_ms_median": round(statistics.median(r["cumulative_ms"] for r in runs), 1),
+                "heaviest_ms": runs[-1]["heaviest_ms"],
+            }
+        help_runs = [measure_help(cwd) for _ in range(samples)]
+        out["main_help_wall_ms_median"] = round(statistics.median(help_runs) * 1000, 1)
+        out["sandbox_created_on_import"] = os.path.exists(os.path.join(cwd, "sandbox"))
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    ap.add_argument("--samples", type=int, default=5)
+    args = ap.parse_args()
+    print(json.dumps(bench_imports(args.modules, args.samples), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Startup time and memory per Agent A launch profile (browser_pool.LAUNCH_PROFILES):
+time to launch, time to first loaded fixture page, and total RSS of the browser's process
+tree with one page open. Profiles that cannot start here (no display for headed, no
+browser build for a channel) are reported as skipped.
+
+    python bench/bench_launch_profiles.py --samples 5
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.common import browser_skip, percentiles  # noqa: E402
+from bench.fixture_server import start_fixture_server  # noqa: E402
+
+
+def _descendant_rss_mb(root: int) -> float:
+    """Summed RSS of every process below `root` (Linux /proc)."""
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    total_kb, stack = 0, list(children.get(root, []))
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            pass
+    return round(total_kb / 1024, 1)
+
+
+async def bench_profile(name: str, url: str, samples: int) -> dict:
+    from playwright.async_api import async_playwright
+    from browser_pool import launch_profile
+
+    launch_opts, context_opts = launch_profile(name)
+    launch, first_page, rss = [], [], []
+    async with async_playwright() as p:
+        for _ in range(samples):
+            t0 = time.perf_counter()
+            browser = await p.chromium.launch(**launch_opts)
+            launch.append(time.perf_counter() - t0)
+            context = await browser.new_context(**context_opts)
+            page = await context.new_page()
+            await page.goto(url, wait_until="load")
+            first_page.append(time.perf_counter() - t0)
+            rss.append(_descendant_rss_mb(os.getpid()))
+            await browser.close()
+    return {
+        "launch_options": launch_opts,
+        "launch_ms": percentiles(launch),
+        "launch_to_loaded_page_ms": percentiles(first_page),
+        "browser_tree_rss_mb": sorted(rss)[len(rss) // 2],
+    }
+
+
+def main():
+    from browser_pool import LAUNCH_PROFILES
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--profiles", nargs="+", default=list(LAUNCH_PROFILES))
+    ap.add_argument("--samples", type=int, default=5)
+    args = ap.parse_args()
+
+    server, _, base = start_fixture_server()
+    url = f"{base}/drive_viewer.html?n=200"
+    results = {}
+    try:
+        for name in args.profiles:
+            try:
+                results[name] = asyncio.run(bench_profile(name, url, args.samples))
+            except Exception as e:
+                results[name] = browser_skip(e)
+    finally:
+        server.shutdown()
+    print(json.dumps({"samples": args.samples, "profiles": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+RSS per Agent B worker process with persisted indexes memory-mapped vs read into RAM.
+
+Builds one synthetic persisted index (random vectors, SQLite docstore), then starts N
+concurrent worker processes that each open it through index_store.load_index and run
+searches. Memory-mapped vectors show up as RssFile (page cache, shared between workers);
+in-RAM copies show up as RssAnon (private, multiplied by the worker count).
+
+    python bench/bench_mmap_rss.py --vectors 200000 --dim 256 --workers 4
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.common import REPO_ROOT  # noqa: E402
+
+PARAMS = {"bench": "mmap_rss"}
+
+
+def _rss() -> dict:
+    out = {}
+    with open("/proc/self/status", "r") as f:
+        for line in f:
+            key = line.split(":")[0]
+            if key in ("VmRSS", "RssAnon", "RssFile"):
+                out[key + "_mb"] = round(int(line.split()[1]) / 1024, 1)
+    return out
+
+
+def build(path: str, n: int, dim: int) -> None:
+    import faiss
+    import numpy as np
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.vectorstores import FAISS
+    from index_store import save_index
+    from local_models import HashedNgramEmbeddings
+
+    rng = np.random.default_rng(0)
+    store = FAISS(HashedNgramEmbeddings(dim), faiss.IndexFlatL2(dim), InMemoryDocstore(), {})
+    step = 50_000
+    for start in range(0, n, step):
+        vecs = rng.random((min(step, n - start), dim), dtype=np.float32)
+        ids = [f"bench:{i}" for i in range(start, start + len(vecs))]
+        texts = [f"chunk {i}" for i in range(start, start + len(vecs))]
+        store.add_embeddings(zip(texts, vecs.tolist()), metadatas=[{"page": i} for i in range(len(vecs))], ids=ids)
+    save_index(path, PARAMS, store)
+
+
+def worker(path: str, mmap: bool, dim: int, searches: int) -> None:
+    import numpy as np
+    from index_store import load_index
+    from local_models import HashedNgramEmbeddings
+
+    base = _rss()
+    t0 = time.perf_counter()
+    store = load_index(path, PARAMS, HashedNgramEmbeddings(dim), mmap=mmap)
+    load_ms = (time.perf_counter() - t0) * 1000
+    rng = np.random.default_rng(os.getpid())
+    for _ in range(searches):
+        store.similarity_search_with_score_by_vector(rng.random(dim, dtype=np.float32).tolist(), k=5)
+    print(json.dumps({"pid": os.getpid(), "load_ms": round(load_ms, 1), "baseline": base, "after": _rss()}), flush=True)
+    sys.stdin.readline()  # stay resident until every worker has reported
+
+
+def run_workers(path: str, mmap: bool, n: int, dim: int, searches: int) -> dict:
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", path, "--dim", str(dim), "--searches", str(searches)]
+    if not mmap:
+        cmd.append("--no-mmap")
+    procs = [
+        subprocess.Popen(cmd, cwd=REPO_ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for _ in range(n)
+    ]
+    reports = [json.loads(p.stdout.readline()) for p in procs]
+    for p in procs:
+        p.stdin.close()
+        p.wait()
+
+    def _total(key: str) -> float:
+        return round(sum(r["after"].get(key, 0.0) - r["baseline"].get(key, 0.0) for r in reports), 1)
+
+    return {
+        "mmap": mmap,
+        "workers": reports,
+        "added_anon_mb_total": _total("RssAnon_mb"),
+        "added_file_mb_total": _total("RssFile_mb"),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--vectors", type=int, default=200_000)
+    ap.add_argument("--dim", type=int, default=256)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--searches", type=int, default=20)
+    ap.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    ap.add_argument("--no-mmap", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.worker:
+        worker(args.worker, not args.no_mmap, args.dim, args.searches)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index")
+        build(path, args.vectors, args.dim)
+        report = {
+            "vectors": args.vectors,
+            "dim": args.dim,
+            "vector_mb": round(args.vectors * args.dim * 4 / (1024 * 1024), 1),
+            "in_ram": run_workers(path, False, args.workers, args.dim, args.searches),
+            "mmap": run_workers(path, True, args.workers, args.dim, args.searches),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
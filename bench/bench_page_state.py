@@ -0,0 +1,101 @@
+"""
+Agent A page-state collection: the single page.evaluate snapshot (_collect_page_state)
+vs the former per-element locator loop (~3 CDP round trips per candidate), against
+bench/fixtures/drive_viewer.html padded with hundreds of aria-labelled controls, plus a
+button inside an open shadow root (the locator loop's CSS pierces it, so the snapshot must
+too). Needs a Playwright Chromium install.
+
+    python bench/bench_page_state.py --elements 100 500 2000 --samples 50
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.common import FIXTURES_DIR, browser_skip, percentiles  # noqa: E402
+
+
+async def legacy_collect_page_state(page) -> Dict[str, Any]:
+    """The pre-evaluate implementation, kept here as the baseline."""
+    title = await page.title()
+    button_texts: List[str] = []
+    loc = page.locator("button, [role='button'], a[role='button'], div[aria-label], button[aria-label]")
+    count = await loc.count()
+    for i in range(min(count, 40)):
+        el = loc.nth(i)
+        try:
+            if not await el.is_visible():
+                continue
+            txt = (await el.inner_text()) or ""
+            aria = (await el.get_attribute("aria-label")) or ""
+            cand = aria.strip() or txt.strip()
+            if cand:
+                button_texts.append(" ".join(cand.split())[:80])
+        except Exception:
+            continue
+    return {"title": title, "url": page.url, "buttons": list(dict.fromkeys(button_texts))[:25]}
+
+
+# Prepended, so it falls inside the first 40 candidates either way.
+_ADD_SHADOW_BUTTON_JS = """
+() => {
+  const host = document.createElement("div");
+  host.attachShadow({mode: "open"}).innerHTML = '<button aria-label="Download (shadow)">Download</button>';
+  document.body.prepend(host);
+}
+"""
+
+
+async def _time(fn, page, samples: int) -> Dict[str, Any]:
+    latencies = []
+    out = None
+    for _ in range(samples):
+        t0 = time.perf_counter()
+        out = await fn(page)
+        latencies.append(time.perf_counter() - t0)
+    return {"latency_ms": percentiles(latencies), "buttons": len(out["buttons"]), "result": out["buttons"]}
+
+
+async def run(elements: List[int], samples: int) -> List[Dict[str, Any]]:
+    from playwright.async_api import async_playwright
+    from agent_a import _collect_page_state
+
+    results = []
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        for n in elements:
+            await page.goto(Path(FIXTURES_DIR, "drive_viewer.html").as_uri() + f"?n={n}")
+            await page.evaluate(_ADD_SHADOW_BUTTON_JS)
+            legacy = await _time(legacy_collect_page_state, page, samples)
+            single = await _time(_collect_page_state, page, samples)
+            results.append({
+                "elements": n,
+                "legacy": {k: v for k, v in legacy.items() if k != "result"},
+                "evaluate": {k: v for k, v in single.items() if k != "result"},
+                "same_buttons": legacy["result"] == single["result"],
+            })
+        await browser.close()
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--elements", type=int, nargs="+", default=[100, 500, 2000])
+    ap.add_argument("--samples", type=int, default=50)
+    args = ap.parse_args()
+    try:
+        results = asyncio.run(run(args.elements, args.samples))
+    except Exception as e:
+        results = [browser_skip(e)]
+    print(json.dumps({"samples": args.samples, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Wall time of Agent B's page extraction (agent_b.load_pdf_pages) across worker counts.
+
+    python bench/bench_pdf_extract.py --pages 800 --workers 1 2 4 8
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_b import load_pdf_pages  # noqa: E402
+from bench.synth_pdf import make_pdf  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=800)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = make_pdf(os.path.join(tmp, "bench.pdf"), args.pages)
+        results = []
+        baseline = None
+        for w in args.workers:
+            times = []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                pages = load_pdf_pages(pdf, workers=w)
+                times.append(time.perf_counter() - t0)
+            assert [d.metadata["page"] for d in pages] == list(range(args.pages))
+            best = min(times)
+            baseline = baseline or best
+            results.append({
+                "workers": w,
+                "best_s": round(best, 3),
+                "mean_s": round(sum(times) / len(times), 3),
+                "speedup": round(baseline / best, 2),
+            })
+
+    print(json.dumps({"pages": args.pages, "cpu_count": os.cpu_count(), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
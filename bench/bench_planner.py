@@ -0,0 +1,79 @@
+"""
+Agent A planner concurrency: N planning calls issued together on one event loop through
+the async planner path (_call_gpt5_mini_plan) vs the former blocking OpenAI client, which
+serialises them. Runs against bench/fake_openai_server.py with injected latency.
+
+    python bench/bench_planner.py --latency-ms 500 --calls 1 8 32
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.fake_openai_server import start_server  # noqa: E402
+
+PAGE_STATE = {"title": "Bravebird Assignment.pdf - Google Drive", "url": "bench://", "buttons": ["Open with", "Download", "More actions"]}
+
+
+async def async_path(calls: int) -> dict:
+    from agent_a import _call_gpt5_mini_plan
+
+    # A ticker stands in for _time_guard: it only advances if the loop is free.
+    ticks = 0
+
+    async def _ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.05)
+            ticks += 1
+
+    ticker = asyncio.create_task(_ticker())
+    t0 = time.perf_counter()
+    plans = await asyncio.gather(*[_call_gpt5_mini_plan(PAGE_STATE, 1, backend="openai") for _ in range(calls)])
+    wall = time.perf_counter() - t0
+    ticker.cancel()
+    return {"wall_s": round(wall, 3), "loop_ticks": ticks, "actions": sorted({p["action"] for p in plans})}
+
+
+def blocking_path(calls: int) -> dict:
+    from openai import OpenAI
+
+    client = OpenAI()
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        client.chat.completions.create(
+            model="gpt-5-mini", messages=[{"role": "user", "content": json.dumps({"page_state": PAGE_STATE})}]
+        )
+    return {"wall_s": round(time.perf_counter() - t0, 3)}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latency-ms", type=float, default=500)
+    ap.add_argument("--calls", type=int, nargs="+", default=[1, 8, 32])
+    args = ap.parse_args()
+
+    server, state, base_url = start_server(latency_ms=args.latency_ms)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "local")
+    results = []
+    try:
+        for n in args.calls:
+            before = dict(state.counters)
+            state.counters["max_in_flight"] = 0
+            entry = {"calls": n, "async": asyncio.run(async_path(n))}
+            entry["async"]["server_max_in_flight"] = state.counters["max_in_flight"]
+            entry["blocking"] = blocking_path(n)
+            entry["plans_served"] = state.counters.get("plans", 0) - before.get("plans", 0)
+            results.append(entry)
+    finally:
+        server.shutdown()
+    print(json.dumps({"latency_ms": args.latency_ms, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
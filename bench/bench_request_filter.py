@@ -0,0 +1,78 @@
+"""
+Page-load time and bytes transferred for the Drive viewer fixture with Agent A's request
+filter (request_filter.DEFAULT_REQUEST_FILTER) attached vs no filtering, served by
+bench/fixture_server.py with heavy preview tiles, a web font, a large script and a
+telemetry beacon. Needs a Playwright Chromium install.
+
+    python bench/bench_request_filter.py --assets 40 --samples 5
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.common import browser_skip, percentiles  # noqa: E402
+from bench.fixture_server import start_fixture_server  # noqa: E402
+
+
+async def run(url: str, samples: int, state) -> dict:
+    from playwright.async_api import async_playwright
+    from request_filter import DEFAULT_REQUEST_FILTER
+
+    out = {}
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        for mode in ("unfiltered", "filtered"):
+            load, ready, sent, filt = [], [], [], None
+            for _ in range(samples):
+                context = await browser.new_context()
+                if mode == "filtered":
+                    filt = await DEFAULT_REQUEST_FILTER.attach(context)
+                page = await context.new_page()
+                before = state.bytes_sent
+                t0 = time.perf_counter()
+                await page.goto(url, wait_until="domcontentloaded")
+                await page.get_by_label("Download").first.wait_for(state="visible")
+                ready.append(time.perf_counter() - t0)
+                await page.wait_for_load_state("load")
+                load.append(time.perf_counter() - t0)
+                sent.append(state.bytes_sent - before)
+                await context.close()
+            out[mode] = {
+                "controls_ready_ms": percentiles(ready),
+                "load_event_ms": percentiles(load),
+                "bytes_served_per_load": sorted(sent)[len(sent) // 2],
+                "last_filter_stats": filt.to_dict() if filt else None,
+            }
+        await browser.close()
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--assets", type=int, default=40)
+    ap.add_argument("--samples", type=int, default=5)
+    args = ap.parse_args()
+
+    server, state, base = start_fixture_server()
+    url = f"{base}/drive_viewer.html?assets={args.assets}"
+    try:
+        report = {"url": url, **asyncio.run(run(url, args.samples, state))}
+    except Exception as e:
+        report = {"url": url, **browser_skip(e)}
+    finally:
+        server.shutdown()
+    print(json.dumps(report, indent=2))
+    if "skipped" not in report:
+        blocked = report["filtered"]["last_filter_stats"]["requests_blocked"]
+        served = {mode: report[mode]["bytes_served_per_load"] for mode in ("unfiltered", "filtered")}
+        assert blocked > 0, "the filter blocked no requests"
+        assert served["filtered"] < served["unfiltered"], f"filtering did not reduce bytes served: {served}"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Small helpers shared by the benchmark scripts.
+"""
+import os
+import sys
+import resource
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def percentiles(samples: List[float], points=(50, 95, 99)) -> Dict[str, float]:
+    """Nearest-rank percentiles in milliseconds (samples are seconds)."""
+    if not samples:
+        return {f"p{p}": 0.0 for p in points}
+    xs = sorted(samples)
+    out = {}
+    for p in points:
+        rank = max(1, -(-p * len(xs) // 100))
+        out[f"p{p}"] = round(xs[rank - 1] * 1000, 2)
+    return out
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def current_rss_mb(pid: int = 0) -> float:
+    """Current RSS from /proc (Linux); falls back to peak RSS elsewhere."""
+    path = f"/proc/{pid or 'self'}/status"
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def dir_size_bytes(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+# Launch errors meaning "no usable browser on this machine" (no build installed, no
+# display for headed mode), as opposed to a failure in the code being measured.
+_BROWSER_UNAVAILABLE = (
+    "Executable doesn't exist",
+    "playwright install",
+    "without having a XServer running",
+    "Missing X server or $DISPLAY",
+    "Host system is missing dependencies",
+)
+
+
+def browser_skip(e: BaseException) -> Dict[str, str]:
+    """
+    {"skipped": <first line of the error>} when `e` means no browser can be launched here;
+    any other error is re-raised, so a real regression still fails the benchmark.
+    """
+    message = str(e).strip()
+    if not any(marker in message for marker in _BROWSER_UNAVAILABLE):
+        raise e
+    return {"skipped": (message.splitlines() or [type(e).__name__])[0][:200]}
@@ -0,0 +1,225 @@
+"""
+Local stand-in for the OpenAI HTTP API, for benchmarks and offline runs.
+
+Serves POST /v1/embeddings with deterministic vectors, and POST /v1/responses and
+/v1/chat/completions answering Agent A planner prompts with backends.heuristic_plan,
+with optional injected latency and rate limiting (HTTP 429 + Retry-After) so client-side
+batching, concurrency and backoff can be exercised without network access.
+
+    python bench/fake_openai_server.py --port 8765 --latency-ms 150 --rpm 120
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=local ...
+"""
+import os
+import sys
+import json
+import math
+import time
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backends import heuristic_plan  # noqa: E402
+
+EMBED_DIM = 64
+
+
+def fake_vector(text: str, dim: int = EMBED_DIM) -> List[float]:
+    raw = b""
+    seed = text.encode("utf-8")
+    while len(raw) < dim:
+        seed = hashlib.sha256(seed).digest()
+        raw += seed
+    vec = [(b - 127.5) / 127.5 for b in raw[:dim]]
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+class FakeOpenAIState:
+    def __init__(self, latency_ms: float = 0.0, rpm: Optional[int] = None, fail_every: int = 0):
+        self.latency_ms = latency_ms
+        self.rpm = rpm
+        self.fail_every = fail_every
+        self.lock = threading.Lock()
+        self.counters: Dict[str, int] = {"requests": 0, "rate_limited": 0, "inputs": 0, "max_in_flight": 0}
+        self._in_flight = 0
+        self._window: List[float] = []
+
+    def admit(self) -> Tuple[bool, float]:
+        """(allowed, retry_after_seconds) under the configured limits."""
+        with self.lock:
+            self.counters["requests"] += 1
+            if self.fail_every and self.counters["requests"] % self.fail_every == 0:
+                self.counters["rate_limited"] += 1
+                return False, 0.2
+            if self.rpm:
+                now = time.time()
+                self._window = [t for t in self._window if now - t < 60.0]
+                if len(self._window) >= self.rpm:
+                    self.counters["rate_limited"] += 1
+                    return False, max(0.05, 60.0 - (now - self._window[0]))
+                self._window.append(now)
+            return True, 0.0
+
+    def enter(self) -> None:
+        with self.lock:
+            self._in_flight += 1
+            self.counters["max_in_flight"] = max(self.counters["max_in_flight"], self._in_flight)
+
+    def leave(self) -> None:
+        with self.lock:
+            self._in_flight -= 1
+
+
+def _make_handler(state: FakeOpenAIState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; without TCP_NODELAY a kept-alive
+        # connection stalls ~40 ms per response on delayed ACKs, as real servers don't.
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args: Any) -> None:  # keep benchmark output clean
+            pass
+
+        def _send(self, code: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+
+            ok, retry_after = state.admit()
+            if not ok:
+                self._send(
+                    429,
+                    {"error": {"message": "Rate limit reached (fake server)", "type": "requests", "code": "rate_limit_exceeded"}},
+                    {"Retry-After": f"{retry_after:.2f}"},
+                )
+                return
+
+            state.enter()
+            try:
+                if state.latency_ms:
+                    time.sleep(state.latency_ms / 1000.0)
+                path = self.path.rstrip("/")
+                if path.endswith("/embeddings"):
+                    self._embeddings(payload)
+                elif path.endswith("/responses"):
+                    self._responses(payload)
+                elif path.endswith("/chat/completions"):
+                    self._chat(payload)
+                else:
+                    self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+            finally:
+                state.leave()
+
+        def _embeddings(self, payload: Dict[str, Any]) -> None:
+            inputs = payload.get("input") or []
+            if isinstance(inputs, str):
+                inputs = [inputs]
+            with state.lock:
+                state.counters["inputs"] += len(inputs)
+            data = [
+                {"object": "embedding", "index": i, "embedding": fake_vector(str(t))}
+                for i, t in enumerate(inputs)
+            ]
+            self._send(200, {
+                "object": "list",
+                "data": data,
+                "model": payload.get("model", "fake"),
+                "usage": {"prompt_tokens": 0, "total_tokens": 0},
+            })
+
+        def _plan_text(self, messages: List[Dict[str, Any]]) -> str:
+            with state.lock:
+                state.counters["plans"] = state.counters.get("plans", 0) + 1
+            user = next((m.get("content") for m in reversed(messages) if m.get("role") == "user"), "{}")
+            try:
+                user = json.loads(user)
+            except (TypeError, ValueError):
+                user = {}
+            return json.dumps(heuristic_plan(user.get("page_state") or {}, user.get("attempt", 1)))
+
+        def _responses(self, payload: Dict[str, Any]) -> None:
+            text = self._plan_text(payload.get("input") or [])
+            self._send(200, {
+                "id": "resp_fake",
+                "object": "response",
+                "created_at": int(time.time()),
+                "model": payload.get("model", "fake"),
+                "status": "completed",
+                "output": [{
+                    "id": "msg_fake",
+                    "type": "message",
+                    "role": "assistant",
+                    "status": "completed",
+                    "content": [{"type": "output_text", "text": text, "annotations": []}],
+                }],
+                "parallel_tool_calls": True,
+                "tool_choice": "auto",
+                "tools": [],
+            })
+
+        def _chat(self, payload: Dict[str, Any]) -> None:
+            text = self._plan_text(payload.get("messages") or [])
+            self._send(200, {
+                "id": "chatcmpl_fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": payload.get("model", "fake"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+
+    return Handler
+
+
+def start_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency_ms: float = 0.0,
+    rpm: Optional[int] = None,
+    fail_every: int = 0,
+) -> Tuple[ThreadingHTTPServer, FakeOpenAIState, str]:
+    """
+    Starts the server on a daemon thread. Returns (server, state, base_url);
+    call server.shutdown() when done.
+    """
+    state = FakeOpenAIState(latency_ms=latency_ms, rpm=rpm, fail_every=fail_every)
+    server = ThreadingHTTPServer((host, port), _make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--rpm", type=int, default=None, help="Requests per minute before answering 429.")
+    ap.add_argument("--fail-every", type=int, default=0, help="Answer every Nth request with 429.")
+    args = ap.parse_args()
+
+    server, state, url = start_server(args.host, args.port, args.latency_ms, args.rpm, args.fail_every)
+    print(f"Fake OpenAI API listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(json.dumps(state.counters))
+
+
+if __name__ == "__main__":
+    main()
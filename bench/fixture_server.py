@@ -0,0 +1,123 @@
+"""
+Local HTTP server for the browser fixtures in bench/fixtures, so Agent A can be driven
+end to end (page load -> planner -> download) without touching Google Drive.
+
+/sample.pdf is generated on first request (bench.synth_pdf) and served as an attachment.
+/assets/<name>?kb=<size>&ms=<delay> serves filler bytes typed by extension (.png, .woff2,
+.js, ...) and /gen_204 answers telemetry beacons, so drive_viewer.html?assets=N can emulate
+the Drive viewer's heavy page. Per-path request counts and bytes sent are kept in state.
+
+    python bench/fixture_server.py --port 8766
+    python main.py --offline --url http://127.0.0.1:8766/drive_viewer.html
+"""
+import os
+import sys
+import time
+import mimetypes
+import argparse
+import tempfile
+import threading
+from collections import Counter
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Tuple
+from urllib.parse import parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.common import FIXTURES_DIR  # noqa: E402
+from bench.synth_pdf import make_pdf  # noqa: E402
+
+
+class FixtureState:
+    def __init__(self, pdf_pages: int = 5):
+        self.pdf_pages = pdf_pages
+        self.hits: Counter = Counter()
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+        self._pdf_path = None
+        self._tmp = tempfile.TemporaryDirectory()
+
+    def pdf_path(self) -> str:
+        with self.lock:
+            if self._pdf_path is None:
+                self._pdf_path = make_pdf(os.path.join(self._tmp.name, "sample.pdf"), self.pdf_pages)
+            return self._pdf_path
+
+
+def _make_handler(state: FixtureState):
+    class Handler(SimpleHTTPRequestHandler):
+        def __init__(self, *args: Any, **kwargs: Any):
+            super().__init__(*args, directory=FIXTURES_DIR, **kwargs)
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+        def _send_bytes(self, data: bytes, content_type: str, extra_headers: Any = ()) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in extra_headers:
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+            with state.lock:
+                state.bytes_sent += len(data)
+
+        def do_GET(self) -> None:
+            path, _, query = self.path.partition("?")
+            with state.lock:
+                state.hits[path] += 1
+            if path.startswith("/assets/"):
+                q = parse_qs(query)
+                time.sleep(float(q.get("ms", ["0"])[0]) / 1000.0)
+                kb = int(q.get("kb", ["64"])[0])
+                ctype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+                body = b"// filler\n" * (kb * 1024 // 10) if ctype.endswith("javascript") else b"\0" * (kb * 1024)
+                self._send_bytes(body, ctype)
+                return
+            if path == "/gen_204":
+                self.send_response(204)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if path == "/sample.pdf":
+                with open(state.pdf_path(), "rb") as f:
+                    data = f.read()
+                self._send_bytes(data, "application/pdf", [("Content-Disposition", 'attachment; filename="sample.pdf"')])
+                return
+            super().do_GET()
+
+    return Handler
+
+
+def start_fixture_server(host: str = "127.0.0.1", port: int = 0, pdf_pages: int = 5) -> Tuple[ThreadingHTTPServer, FixtureState, str]:
+    """
+    Starts the server on a daemon thread. Returns (server, state, base_url);
+    call server.shutdown() when done.
+    """
+    state = FixtureState(pdf_pages=pdf_pages)
+    server = ThreadingHTTPServer((host, port), _make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8766)
+    ap.add_argument("--pdf-pages", type=int, default=5)
+    args = ap.parse_args()
+
+    server, state, url = start_fixture_server(args.host, args.port, args.pdf_pages)
+    print(f"Fixtures served at {url}/drive_viewer.html")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(dict(state.hits))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Dependency-free generator for synthetic text PDFs used by the benchmarks.
+Every page carries distinct, extractable text so chunking/embedding work scales with page count.
+"""
+import os
+from typing import List
+
+_WORDS = (
+    "agreement party clause term payment invoice delivery warranty liability notice "
+    "termination schedule amendment confidential obligation renewal fee service"
+).split()
+
+
+def _page_text(page_no: int, lines: int) -> List[str]:
+    out = []
+    for i in range(lines):
+        n = page_no * lines + i
+        words = " ".join(_WORDS[(n * 7 + k) % len(_WORDS)] for k in range(9))
+        out.append(f"Section {page_no + 1}.{i + 1} {words} ref {n}")
+    return out
+
+
+def _escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(path: str, pages: int, lines_per_page: int = 45) -> str:
+    objects: List[bytes] = []
+
+    def add(obj: bytes) -> int:
+        objects.append(obj)
+        return len(objects)
+
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = add(b"")  # patched once kids are known
+    kids = []
+    for p in range(pages):
+        ops = ["BT", "/F1 9 Tf", "40 800 Td", "11 TL"]
+        ops += [f"({_escape(line)}) '" for line in _page_text(p, lines_per_page)]
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        kids.append(add(
+            f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 595 842] "
+            f"/Contents {content_id} 0 R /Resources << /Font << /F1 {font_id} 0 R >> >> >>".encode()
+        ))
+    objects[pages_id - 1] = (
+        f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {len(kids)} >>".encode()
+    )
+    catalog_id = add(f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode())
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root {catalog_id} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(out)
+    return path
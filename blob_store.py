@@ -0,0 +1,117 @@
+import os
+import uuid
+import hashlib
+from dataclasses import dataclass
+from typing import Tuple
+
+
+def copy_and_hash(src: str, dst: str, chunk_size: int = 1024 * 1024) -> Tuple[str, int]:
+    """
+    Copies src to dst and returns (sha256 hex, byte count) from the same pass, so the
+    file is read once. Written to dst + ".part" and renamed into place.
+    """
+    h = hashlib.sha256()
+    total = 0
+    tmp = dst + ".part"
+    with open(src, "rb") as fin, open(tmp, "wb") as fout:
+        for chunk in iter(lambda: fin.read(chunk_size), b""):
+            h.update(chunk)
+            fout.write(chunk)
+            total += len(chunk)
+    os.replace(tmp, dst)
+    return h.hexdigest(), total
+
+
+def _hash_file(path: str, chunk_size: int = 1024 * 1024) -> Tuple[str, int]:
+    h = hashlib.sha256()
+    total = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+            total += len(chunk)
+    return h.hexdigest(), total
+
+
+@dataclass
+class StoredBlob:
+    sha256: str
+    bytes: int
+    blob_path: str  # <root>/blobs/<sha[:2]>/<sha><ext>
+    path: str  # friendly name (hardlink, else symlink, else the blob itself)
+    name: str
+    deduplicated: bool  # content was already in the store
+
+
+class BlobStore:
+    """
+    Content-addressed file store: each distinct file is kept once under its SHA-256, and
+    human-readable names in `root` point at it (hardlinks where the filesystem allows,
+    symlinks otherwise). Files enter by link/rename, never by an extra copy when the
+    source is on the same filesystem. A name already taken by different content gets
+    the hash prefix appended instead of being overwritten.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.blobs_dir = os.path.join(root, "blobs")
+        # Temp files on the store's filesystem; point the browser's downloads_path here so
+        # its downloads always enter by link, never by copy.
+        self.incoming_dir = os.path.join(self.blobs_dir, ".incoming")
+        os.makedirs(self.incoming_dir, exist_ok=True)
+
+    def incoming_path(self) -> str:
+        """
+        Fresh temp path inside the store, for writers that need a destination file (e.g.
+        Playwright's save_as); hand the finished file to adopt().
+        """
+        return os.path.join(self.incoming_dir, uuid.uuid4().hex)
+
+    def blob_path(self, sha256: str, ext: str = ".pdf") -> str:
+        return os.path.join(self.blobs_dir, sha256[:2], sha256 + ext)
+
+    def put_file(self, src: str, name: str) -> StoredBlob:
+        """Adds a copy of src (left untouched) under `name`."""
+        incoming = self.incoming_path()
+        try:
+            os.link(src, incoming)  # same filesystem: no data copied
+        except OSError:
+            sha, size = copy_and_hash(src, incoming)
+            return self._commit(incoming, sha, size, name)
+        return self.adopt(incoming, name)
+
+    def adopt(self, path: str, name: str) -> StoredBlob:
+        """Moves `path` (on the store's filesystem) into the store under `name`."""
+        sha, size = _hash_file(path)
+        return self._commit(path, sha, size, name)
+
+    def _commit(self, incoming: str, sha: str, size: int, name: str) -> StoredBlob:
+        ext = os.path.splitext(name)[1] or ".bin"
+        blob = self.blob_path(sha, ext)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        deduplicated = os.path.exists(blob)
+        if deduplicated:
+            os.unlink(incoming)
+        else:
+            os.replace(incoming, blob)  # atomic; a concurrent identical put is harmless
+        path, name = self._link_name(blob, sha, name)
+        return StoredBlob(sha256=sha, bytes=size, blob_path=blob, path=path, name=name, deduplicated=deduplicated)
+
+    def _link_name(self, blob: str, sha: str, name: str) -> Tuple[str, str]:
+        stem, ext = os.path.splitext(name)
+        for candidate in (name, f"{stem} ({sha[:12]}){ext}"):
+            path = os.path.join(self.root, candidate)
+            try:
+                # link/symlink fail if the name exists, so a name never changes content.
+                try:
+                    os.link(blob, path)
+                except OSError as e:
+                    if isinstance(e, FileExistsError):
+                        raise
+                    os.symlink(os.path.relpath(blob, self.root), path)
+                return path, candidate
+            except FileExistsError:
+                if os.path.samefile(path, blob):
+                    return path, candidate
+            except OSError:
+                break
+        return blob, os.path.basename(blob)
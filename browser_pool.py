@@ -0,0 +1,199 @@
+import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("agent_a")
+
+ANTI_AUTOMATION_ARGS = ["--disable-blink-features=AutomationControlled"]
+# Trimmed Chromium for dense server packing: no GPU, extensions, background services or
+# first-run work. Kept alongside (never instead of) the anti-automation flag.
+LIGHTWEIGHT_ARGS = [
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-dev-shm-usage",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-sync",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--mute-audio",
+]
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# profile -> (launch options, context options)
+LAUNCH_PROFILES: Dict[str, Tuple[Dict[str, Any], Dict[str, Any]]] = {
+    # The original behaviour: a visible window (needs a display).
+    "headed": (
+        {"headless": False, "args": ANTI_AUTOMATION_ARGS},
+        {"accept_downloads": True, "user_agent": USER_AGENT},
+    ),
+    # Playwright's headless shell: smallest footprint.
+    "headless": (
+        {"headless": True, "args": ANTI_AUTOMATION_ARGS + LIGHTWEIGHT_ARGS},
+        {"accept_downloads": True, "user_agent": USER_AGENT, "viewport": {"width": 1024, "height": 768}},
+    ),
+    # Full Chromium in new headless mode: same engine as headed, no window.
+    "new-headless": (
+        {"headless": True, "channel": "chromium", "args": ANTI_AUTOMATION_ARGS + LIGHTWEIGHT_ARGS},
+        {"accept_downloads": True, "user_agent": USER_AGENT, "viewport": {"width": 1024, "height": 768}},
+    ),
+}
+DEFAULT_PROFILE = "headed"
+PROFILE_ENV = "AGENT_A_BROWSER_PROFILE"
+
+
+def launch_profile(name: Optional[str] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """(launch_options, context_options) for a profile; argument > AGENT_A_BROWSER_PROFILE > headed."""
+    name = name or os.getenv(PROFILE_ENV) or DEFAULT_PROFILE
+    if name not in LAUNCH_PROFILES:
+        raise ValueError(f"Unknown browser profile '{name}' (set via {PROFILE_ENV}); choose from {sorted(LAUNCH_PROFILES)}")
+    launch, context = LAUNCH_PROFILES[name]
+    return dict(launch), dict(context)
+
+
+class _BrowserSlot:
+    def __init__(self, index: int):
+        self.index = index
+        self.browser = None
+        self.active = 0  # contexts currently leased
+        self.uses = 0  # contexts handed out since launch
+        self.retiring = False
+
+    def healthy(self) -> bool:
+        return self.browser is not None and self.browser.is_connected() and not self.retiring
+
+
+class BrowserPool:
+    """
+    Long-lived Chromium instances that DownloadAgent leases fresh contexts from.
+
+    size browsers x contexts_per_browser concurrent leases. A browser is recycled
+    (closed and relaunched on next demand) after recycle_after leases, or as soon as it is
+    found disconnected, so a leaked renderer or crash never outlives a few downloads.
+    Each lease is a new incognito context: cookies/downloads never cross between runs.
+    `profile` picks launch/context options from LAUNCH_PROFILES; explicit launch_options /
+    context_options override it. `downloads_path` is where the browsers keep download temp
+    files (Playwright's default is the system temp dir).
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        contexts_per_browser: int = 4,
+        recycle_after: int = 50,
+        profile: Optional[str] = None,
+        launch_options: Optional[Dict[str, Any]] = None,
+        context_options: Optional[Dict[str, Any]] = None,
+        downloads_path: Optional[str] = None,
+    ):
+        self.size = size
+        self.contexts_per_browser = contexts_per_browser
+        self.recycle_after = recycle_after
+        profile_launch, profile_context = launch_profile(profile)
+        self.launch_options = dict(launch_options or profile_launch)
+        if downloads_path:
+            self.launch_options["downloads_path"] = downloads_path
+        self.context_options = dict(context_options or profile_context)
+        self._slots: List[_BrowserSlot] = [_BrowserSlot(i) for i in range(size)]
+        self._capacity = asyncio.Semaphore(size * contexts_per_browser)
+        self._cond = asyncio.Condition()
+        self._pw = None
+        self.stats = {"launches": 0, "recycles": 0, "leases": 0, "unhealthy": 0}
+
+    async def _ensure_playwright(self):
+        if self._pw is None:
+            from playwright.async_api import async_playwright  # deferred: ~60 ms of import
+
+            self._pw = await async_playwright().start()
+        return self._pw
+
+    async def _launch(self, slot: _BrowserSlot) -> None:
+        pw = await self._ensure_playwright()
+        slot.browser = await pw.chromium.launch(**self.launch_options)
+        slot.active = 0
+        slot.uses = 0
+        slot.retiring = False
+        self.stats["launches"] += 1
+        logger.info(f"BrowserPool: launched browser[{slot.index}]")
+
+    async def _close_slot(self, slot: _BrowserSlot) -> None:
+        browser, slot.browser = slot.browser, None
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.info(f"BrowserPool: close browser[{slot.index}] failed: {e}")
+
+    def _pick_slot(self) -> Optional[_BrowserSlot]:
+        for slot in self._slots:
+            if slot.browser is not None and not slot.browser.is_connected():
+                self.stats["unhealthy"] += 1
+                logger.info(f"BrowserPool: browser[{slot.index}] disconnected; relaunching.")
+                slot.browser = None
+                slot.retiring = False
+
+        # Least-loaded healthy browser first; an empty slot (launched by the caller) otherwise.
+        candidates = [s for s in self._slots if s.healthy() and s.active < self.contexts_per_browser]
+        if candidates:
+            return min(candidates, key=lambda s: s.active)
+        empty = [s for s in self._slots if s.browser is None]
+        return empty[0] if empty else None
+
+    async def _acquire_slot(self) -> _BrowserSlot:
+        async with self._cond:
+            # None only while every browser is retiring with leases still out; wait for a release.
+            await self._cond.wait_for(lambda: self._pick_slot() is not None)
+            slot = self._pick_slot()
+            if slot.browser is None:
+                await self._launch(slot)
+
+            slot.active += 1
+            slot.uses += 1
+            if slot.uses >= self.recycle_after:
+                slot.retiring = True
+            return slot
+
+    async def _release_slot(self, slot: _BrowserSlot) -> None:
+        async with self._cond:
+            slot.active -= 1
+            if slot.retiring and slot.active == 0:
+                self.stats["recycles"] += 1
+                logger.info(f"BrowserPool: recycling browser[{slot.index}] after {slot.uses} leases.")
+                await self._close_slot(slot)
+                slot.retiring = False
+            self._cond.notify_all()
+
+    @asynccontextmanager
+    async def lease(self, **context_overrides: Any) -> AsyncIterator[Any]:
+        """
+        async with pool.lease() as context: ...  (context is closed on exit)
+        """
+        async with self._capacity:
+            slot = await self._acquire_slot()
+            self.stats["leases"] += 1
+            context = None
+            try:
+                try:
+                    context = await slot.browser.new_context(**{**self.context_options, **context_overrides})
+                except Exception:
+                    # Browser died between the health check and now; retire it.
+                    slot.retiring = True
+                    raise
+                yield context
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception:
+                        pass
+                await self._release_slot(slot)
+
+    async def close(self) -> None:
+        async with self._cond:
+            for slot in self._slots:
+                await self._close_slot(slot)
+            if self._pw is not None:
+                await self._pw.stop()
+                self._pw = None
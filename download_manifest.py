@@ -0,0 +1,81 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, Optional
+
+
+DEFAULT_MAX_AGE_S = 24 * 3600
+
+
+class DownloadManifest:
+    """
+    source_url -> last successful handoff (sha256, bytes, file path, fetch time).
+    lookup() returns the stored handoff only while it is fresh (fetched within max_age_s)
+    and its file is still on disk with the recorded size; anything else is a miss and the
+    caller downloads again.
+    """
+
+    def __init__(self, path: str, max_age_s: float = DEFAULT_MAX_AGE_S):
+        self.path = path
+        self.max_age_s = max_age_s
+        self.counters = {"hits": 0, "misses": 0, "stale": 0, "missing_file": 0, "forced": 0}
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS downloads ("
+            " url TEXT PRIMARY KEY,"
+            " sha256 TEXT NOT NULL,"
+            " bytes INTEGER NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " handoff TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def lookup(self, url: str, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
+        if force_refresh:
+            self.counters["forced"] += 1
+            self.counters["misses"] += 1
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT bytes, fetched_at, handoff FROM downloads WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            self.counters["misses"] += 1
+            return None
+        size, fetched_at, raw = row
+        age = time.time() - fetched_at
+        if age > self.max_age_s:
+            self.counters["stale"] += 1
+            self.counters["misses"] += 1
+            return None
+        handoff = json.loads(raw)
+        path = handoff.get("file_path") or ""
+        if not os.path.isfile(path) or os.path.getsize(path) != size:
+            self.counters["missing_file"] += 1
+            self.counters["misses"] += 1
+            return None
+        self.counters["hits"] += 1
+        handoff["extra"] = {**handoff.get("extra", {}), "manifest": {"hit": True, "age_s": round(age, 1)}}
+        return handoff
+
+    def record(self, url: str, handoff: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO downloads (url, sha256, bytes, fetched_at, handoff) VALUES (?, ?, ?, ?, ?)",
+                (url, handoff["sha256"], handoff["bytes"], time.time(), json.dumps(handoff)),
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {**self.counters, "hit_rate": round(self.counters["hits"] / lookups, 3) if lookups else 0.0}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,152 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from array import array
+from typing import Dict, Any, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# SQLite's default host-parameter limit is 999; stay well under it.
+_SQL_BATCH = 500
+
+
+def _chunk_key(model: str, text: str) -> str:
+    h = hashlib.sha256()
+    h.update(model.encode("utf-8"))
+    h.update(b"\0")
+    h.update(text.encode("utf-8"))
+    return h.hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding store: sha256(model + chunk text) -> float32 vector.
+    Backed by a single SQLite file; least-recently-used rows are evicted once the
+    stored vectors exceed max_bytes.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " nbytes INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_lru ON embeddings(last_used)")
+        self._conn.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        if not keys:
+            return found
+        now = time.time()
+        with self._lock:
+            for i in range(0, len(keys), _SQL_BATCH):
+                batch = keys[i:i + _SQL_BATCH]
+                marks = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({marks})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    vec = array("f")
+                    vec.frombytes(blob)
+                    found[key] = vec.tolist()
+                if rows:
+                    self._conn.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                        [(now, key) for key, _ in rows],
+                    )
+            self._conn.commit()
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for key, vec in items.items():
+            blob = array("f", vec).tobytes()
+            rows.append((key, blob, len(blob), now))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, nbytes, last_used) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._evict_locked()
+            self._conn.commit()
+
+    def _evict_locked(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM embeddings").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        victims = []
+        for key, nbytes in self._conn.execute("SELECT key, nbytes FROM embeddings ORDER BY last_used ASC"):
+            victims.append((key,))
+            excess -= nbytes
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", victims)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM embeddings"
+            ).fetchone()
+        return {"entries": entries, "bytes": total, "max_bytes": self.max_bytes}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps any Embeddings so document chunks already seen (by exact text, for the
+    same model) are served from an EmbeddingCache; only misses reach the backend.
+    Queries are passed through uncached.
+    """
+
+    def __init__(self, underlying: Embeddings, cache: EmbeddingCache, model: Optional[str] = None):
+        self.underlying = underlying
+        self.cache = cache
+        # Exposed as .model so index keys stay identical with or without the cache.
+        self.model = model or getattr(underlying, "model", None) or type(underlying).__name__
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [_chunk_key(self.model, t) for t in texts]
+        found = self.cache.get_many(list(dict.fromkeys(keys)))
+
+        # De-dup misses so identical chunks inside one call are embedded once.
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+
+        if missing:
+            vectors = self.underlying.embed_documents(list(missing.values()))
+            fresh = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(fresh)
+            found.update(fresh)
+
+        self.misses += len(missing)
+        self.hits += len(texts) - len(missing)
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.underlying.embed_query(text)
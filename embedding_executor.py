@@ -0,0 +1,162 @@
+import os
+import asyncio
+import logging
+import weakref
+import threading
+from typing import Any, Dict, List, Optional
+
+from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception_type, before_sleep_log
+from openai import AsyncOpenAI, RateLimitError, APIConnectionError, APITimeoutError, InternalServerError
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger("agent_b")
+
+# Same default model as langchain's OpenAIEmbeddings, so persisted indexes and
+# cached chunk vectors stay valid when switching executors.
+DEFAULT_EMBED_MODEL = "text-embedding-ada-002"
+# Per-request token budget. Smaller requests mean more of them in flight; the API
+# itself accepts far more (and at most 2048 inputs).
+DEFAULT_MAX_BATCH_TOKENS = 8_000
+DEFAULT_MAX_BATCH_INPUTS = 2048
+DEFAULT_MAX_CONCURRENCY = 4
+
+_RETRYABLE = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+
+
+def _estimate_tokens(text: str) -> int:
+    # ~4 chars/token for English; cheap and needs no tokenizer download (air-gapped runs).
+    return len(text) // 4 + 1
+
+
+def _pack_batches(texts: List[str], max_tokens: int, max_inputs: int) -> List[List[int]]:
+    """
+    Greedy packing of input positions into request batches bounded by an estimated token
+    budget and an input count. A single oversized text still gets its own batch.
+    """
+    batches: List[List[int]] = []
+    cur: List[int] = []
+    cur_tokens = 0
+    for i, t in enumerate(texts):
+        n = _estimate_tokens(t)
+        if cur and (cur_tokens + n > max_tokens or len(cur) >= max_inputs):
+            batches.append(cur)
+            cur, cur_tokens = [], 0
+        cur.append(i)
+        cur_tokens += n
+    if cur:
+        batches.append(cur)
+    return batches
+
+
+class AsyncBatchEmbeddings(Embeddings):
+    """
+    OpenAI-compatible embeddings executor: packs inputs into token-bounded batches,
+    keeps up to max_concurrency requests in flight and backs off (tenacity, jittered
+    exponential) on 429s and transient errors. base_url may point at any endpoint that
+    speaks /v1/embeddings, e.g. bench/fake_openai_server.py.
+
+    The sync methods run on one long-lived event loop in a helper thread (so they also
+    work from inside a running loop, as main.py indexes from asyncio.run), and each loop
+    keeps one client: every query after the first reuses the same loop and connection.
+    """
+
+    def __init__(
+        self,
+        model: str = DEFAULT_EMBED_MODEL,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+        max_batch_inputs: int = DEFAULT_MAX_BATCH_INPUTS,
+        max_attempts: int = 6,
+        request_timeout: float = 60.0,
+    ):
+        self.model = model
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL")
+        self.max_concurrency = max_concurrency
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_inputs = max_batch_inputs
+        self.max_attempts = max_attempts
+        self.request_timeout = request_timeout
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "inputs": 0, "retries": 0, "rate_limited": 0}
+        # One client per event loop: its connection pool is bound to the loop that created it.
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+    def _bump(self, **deltas: int) -> None:
+        with self._stats_lock:
+            for k, v in deltas.items():
+                self.stats[k] += v
+
+    def _client(self) -> AsyncOpenAI:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._clients[loop] = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                max_retries=0,  # tenacity owns retries
+                timeout=self.request_timeout,
+            )
+        return client
+
+    def _run_sync(self, coro):
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="embedding-executor", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        batches = _pack_batches(texts, self.max_batch_tokens, self.max_batch_inputs)
+        sem = asyncio.Semaphore(self.max_concurrency)
+        out: List[Optional[List[float]]] = [None] * len(texts)
+
+        client = self._client()
+
+        @retry(
+            retry=retry_if_exception_type(_RETRYABLE),
+            stop=stop_after_attempt(self.max_attempts),
+            wait=wait_random_exponential(multiplier=0.5, max=20),
+            before_sleep=before_sleep_log(logger, logging.INFO),
+            reraise=True,
+        )
+        async def _request(batch: List[str]) -> List[List[float]]:
+            try:
+                resp = await client.embeddings.create(model=self.model, input=batch)
+            except RateLimitError:
+                self._bump(rate_limited=1, retries=1)
+                raise
+            except _RETRYABLE:
+                self._bump(retries=1)
+                raise
+            self._bump(requests=1, inputs=len(batch))
+            return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+
+        async def _run(positions: List[int]) -> None:
+            async with sem:
+                vectors = await _request([texts[i] for i in positions])
+            for i, vec in zip(positions, vectors):
+                out[i] = vec
+
+        await asyncio.gather(*(_run(b) for b in batches))
+
+        return out  # type: ignore[return-value]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._run_sync(self.aembed_documents(texts))
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._run_sync(self.aembed_query(text))
+
+    def stats_snapshot(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return dict(self.stats)
@@ -0,0 +1,434 @@
+"""
+On-disk format for Agent B's per-document indexes.
+
+    <dir>/index.faiss   faiss.write_index output, opened with IO_FLAG_MMAP so vectors live
+                        in the page cache and are shared by every process on the host
+    <dir>/docstore.db   SQLite: row -> chunk id, text, metadata (no pickle, opened read-only)
+    <dir>/meta.json     build parameters; a mismatch means the index is stale
+
+faiss only memory-maps IVF inverted lists; a flat index is always copied into RAM on read.
+Exact (flat) indexes are therefore stored as a single-list IVF ("IVF1,Flat"): every
+vector sits in one list that is always probed, so search stays exhaustive and exact.
+
+Large documents get an approximate index (see IndexSpec / choose_index_spec): IVF-Flat
+(raw vectors, recall tuned by nprobe) and, past ~1M chunks, IVF-PQ (compressed codes);
+both are trained on a sample and stay memory-mappable. HNSW is available on request
+(lowest latency, but the graph is always read into RAM).
+"""
+import os
+import json
+import shutil
+import sqlite3
+import logging
+import tempfile
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_community.docstore.base import Docstore
+from langchain_community.vectorstores import FAISS
+
+logger = logging.getLogger("agent_b")
+
+INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "docstore.db"
+META_FILE = "meta.json"
+
+MMAP_FLAGS = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+
+# Below this many vectors an exact scan is fast enough and training an IVF is not worth it.
+FLAT_MAX_VECTORS = 20_000
+# Above this, raw float32 vectors get expensive even when shared; switch to PQ codes.
+IVFFLAT_MAX_VECTORS = 1_000_000
+
+
+@dataclass
+class IndexSpec:
+    """
+    kind: "flat" (exact), "ivfflat", "ivfpq" or "hnsw". Zero-valued build parameters are derived
+    from the corpus size/dimension; nprobe / ef_search are the search-time knobs
+    (recall vs latency) and can be overridden when the index is opened.
+    """
+
+    kind: str = "flat"
+    nlist: int = 0
+    pq_m: int = 0
+    pq_nbits: int = 8
+    hnsw_m: int = 32
+    ef_construction: int = 200
+    ef_search: int = 64
+    nprobe: int = 0
+    train_size: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _pq_m(dim: int) -> int:
+    # Sub-vectors of ~4 dims: 1536-d (ada-002) -> 384 bytes/vector instead of 6 KiB.
+    # Coarser splits compress more but lose too much recall on embedding data.
+    for width in (4, 8, 2, 16, 12, 6, 3):
+        if dim % width == 0:
+            return dim // width
+    return 1
+
+
+def choose_index_spec(n: int, dim: int) -> IndexSpec:
+    if n <= FLAT_MAX_VECTORS:
+        return IndexSpec(kind="flat")
+    if n <= IVFFLAT_MAX_VECTORS:
+        return IndexSpec(kind="ivfflat")
+    return IndexSpec(kind="ivfpq")
+
+
+def _resolve_spec(spec: IndexSpec, n: int, dim: int) -> IndexSpec:
+    spec = IndexSpec(**spec.to_dict())
+    if spec.kind == "ivfpq" and n < 39 * (1 << spec.pq_nbits):
+        # Too few vectors to train the PQ codebooks; exact search is cheap at this size anyway.
+        logger.info(f"Agent B: {n} vectors is too few for IVF-PQ; using an exact index.")
+        return IndexSpec(kind="flat")
+    if spec.kind in ("ivfflat", "ivfpq"):
+        # k-means wants ~39+ points per centroid; shrink nlist for small corpora instead of failing.
+        spec.nlist = spec.nlist or int(min(65_536, max(64, 4 * int(n ** 0.5))))
+        spec.nlist = max(1, min(spec.nlist, n // 39))
+        spec.nprobe = spec.nprobe or max(8, spec.nlist // (16 if spec.kind == "ivfflat" else 32))
+        spec.train_size = spec.train_size or min(n, max(40 * spec.nlist, 39 * 256))
+    if spec.kind == "ivfpq":
+        spec.pq_m = spec.pq_m or _pq_m(dim)
+        if dim % spec.pq_m:
+            raise ValueError(f"pq_m={spec.pq_m} must divide the embedding dimension {dim}")
+    return spec
+
+
+def _train_sample(vectors: np.ndarray, size: int) -> np.ndarray:
+    if size >= len(vectors):
+        return vectors
+    rng = np.random.default_rng(0)
+    return np.ascontiguousarray(vectors[rng.choice(len(vectors), size=size, replace=False)])
+
+
+def build_faiss_index(vectors: np.ndarray, spec: IndexSpec, metric: int = faiss.METRIC_L2) -> Tuple[Any, IndexSpec]:
+    """
+    Builds (and trains, on a random sample) the index described by spec over vectors.
+    Returns the index and the spec with size-derived parameters filled in.
+    """
+    n, dim = vectors.shape
+    spec = _resolve_spec(spec, n, dim)
+
+    if spec.kind == "flat":
+        quantizer = faiss.IndexFlat(dim, metric)
+        quantizer.add(np.zeros((1, dim), dtype=np.float32))
+        index = faiss.IndexIVFFlat(quantizer, dim, 1, metric)
+        index.is_trained = True
+        index.nprobe = 1
+    elif spec.kind == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, spec.hnsw_m, metric)
+        index.hnsw.efConstruction = spec.ef_construction
+        index.hnsw.efSearch = spec.ef_search
+    elif spec.kind == "ivfflat":
+        quantizer = faiss.IndexFlat(dim, metric)
+        index = faiss.IndexIVFFlat(quantizer, dim, spec.nlist, metric)
+        index.train(_train_sample(vectors, spec.train_size))
+        index.nprobe = spec.nprobe
+    elif spec.kind == "ivfpq":
+        quantizer = faiss.IndexFlat(dim, metric)
+        index = faiss.IndexIVFPQ(quantizer, dim, spec.nlist, spec.pq_m, spec.pq_nbits, metric)
+        index.train(_train_sample(vectors, spec.train_size))
+        index.nprobe = spec.nprobe
+    else:
+        raise ValueError(f"Unknown index kind: {spec.kind}")
+
+    index.add(vectors)
+    return index, spec
+
+
+def apply_search_params(index: Any, nprobe: Optional[int] = None, ef_search: Optional[int] = None) -> None:
+    if nprobe:
+        ivf = faiss.try_extract_index_ivf(index)
+        # The single-list exact layout always probes its one list.
+        if ivf is not None and ivf.nlist > 1:
+            ivf.nprobe = nprobe
+    if ef_search and isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = ef_search
+
+
+class SQLiteDocstore(Docstore):
+    """
+    Read-only langchain Docstore over docstore.db. Rows are fetched on demand, so a
+    process only pays memory for the chunks its queries actually return.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+
+    def search(self, search: str) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT page_content, metadata FROM chunks WHERE id = ?", (search,)
+            ).fetchone()
+        if row is None:
+            return f"ID {search} not found."
+        return Document(page_content=row[0], metadata=json.loads(row[1]))
+
+    def delete(self, ids: List) -> None:
+        raise ValueError("Persisted docstores are read-only; remove the document's segment instead.")
+
+    def execute(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SQLiteRowMap(Mapping):
+    """
+    index_to_docstore_id backed by the same table, so it costs no per-row RAM.
+    """
+
+    def __init__(self, docstore: SQLiteDocstore):
+        self._docstore = docstore
+        self._len = docstore.execute("SELECT COUNT(*) FROM chunks")[0][0]
+
+    def __getitem__(self, row: int) -> str:
+        found = self._docstore.execute("SELECT id FROM chunks WHERE row = ?", (int(row),))
+        if not found:
+            raise KeyError(row)
+        return found[0][0]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(r for (r,) in self._docstore.execute("SELECT row FROM chunks ORDER BY row"))
+
+    def __len__(self) -> int:
+        return self._len
+
+    def values(self):
+        return [i for (i,) in self._docstore.execute("SELECT id FROM chunks ORDER BY row")]
+
+    def items(self):
+        return self._docstore.execute("SELECT row, id FROM chunks ORDER BY row")
+
+
+def _stored_vectors(index: Any) -> np.ndarray:
+    """The index's vectors; a zero-copy view for flat indexes, else reconstructed."""
+    n, dim = index.ntotal, index.d
+    if isinstance(index, faiss.IndexFlat) and n:
+        return faiss.rev_swig_ptr(index.get_xb(), n * dim).reshape(n, dim)
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None and ivf.direct_map.type == faiss.DirectMap.NoMap:
+        ivf.make_direct_map()  # id -> list position, needed by reconstruct (in RAM, ids only)
+    return index.reconstruct_n(0, n)
+
+
+_T = TypeVar("_T")
+
+
+def _install(path: str, write: Callable[[str], _T]) -> _T:
+    """
+    Runs write(tmp_dir) on a temp dir unique to this call, next to `path`, then swaps it
+    into place (see _swap_in). Concurrent writers of the same path never touch each
+    other's files, and readers only ever open a complete index.
+    """
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(prefix=f".{os.path.basename(path)}.tmp-", dir=parent)
+    os.chmod(tmp_path, 0o755)  # mkdtemp's 0700 would hide the index from other users' processes
+    try:
+        result = write(tmp_path)
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    _swap_in(tmp_path, path)
+    return result
+
+
+def save_index(path: str, params: Dict[str, Any], store: FAISS, spec: Optional[IndexSpec] = None) -> IndexSpec:
+    """
+    Writes store under `path` (built aside and swapped in, see _install), re-indexing its
+    vectors with `spec` (default: chosen by size). store.index must support reconstruct
+    (the flat staging index is read in place). Returns the spec used.
+    """
+    return _install(path, lambda tmp_path: _write_index_dir(tmp_path, params, store, spec))
+
+
+def build_archive(path: str, params: Dict[str, Any], segments: Dict[str, FAISS], spec: Optional[IndexSpec] = None) -> IndexSpec:
+    """
+    Compacts persisted document segments (sha256 -> store) into one archive-level index
+    under `path`: their vectors concatenated and re-indexed with `spec`, by default chosen
+    by the *total* chunk count, so a collection of many small documents gets a trained
+    IVF / IVF-PQ index instead of one exact scan per document. Chunk rows are copied into
+    a single docstore; meta.json lists the archived documents. Returns the spec used.
+    """
+    return _install(path, lambda tmp_path: _write_archive_dir(tmp_path, params, segments, spec))
+
+
+def read_index_meta(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_index_dir(tmp_path: str, params: Dict[str, Any], store: FAISS, spec: Optional[IndexSpec]) -> IndexSpec:
+    n, dim = store.index.ntotal, store.index.d
+    spec = spec or choose_index_spec(n, dim)
+    vectors = _stored_vectors(store.index)
+    index, spec = build_faiss_index(vectors, spec, metric=store.index.metric_type)
+    faiss.write_index(index, os.path.join(tmp_path, INDEX_FILE))
+
+    conn = sqlite3.connect(os.path.join(tmp_path, DOCSTORE_FILE))
+    try:
+        _create_chunks_table(conn)
+        rows = []
+        for row, doc_id in sorted(store.index_to_docstore_id.items()):
+            doc = store.docstore.search(doc_id)
+            rows.append((row, doc_id, doc.page_content, json.dumps(doc.metadata)))
+        conn.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?)", rows)
+        conn.commit()
+    finally:
+        conn.close()
+
+    meta = {
+        "params": params,
+        "chunks": n,
+        "index_spec": spec.to_dict(),
+        "built_at_iso": datetime.now(timezone.utc).isoformat(),
+    }
+    with open(os.path.join(tmp_path, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    return spec
+
+
+def _create_chunks_table(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        "CREATE TABLE chunks ("
+        " row INTEGER PRIMARY KEY,"
+        " id TEXT UNIQUE NOT NULL,"
+        " page_content TEXT NOT NULL,"
+        " metadata TEXT NOT NULL)"
+    )
+
+
+def _write_archive_dir(tmp_path: str, params: Dict[str, Any], segments: Dict[str, FAISS], spec: Optional[IndexSpec]) -> IndexSpec:
+    stores = list(segments.values())
+    vectors = np.ascontiguousarray(np.concatenate([_stored_vectors(s.index) for s in stores]), dtype=np.float32)
+    n, dim = vectors.shape
+    spec = spec or choose_index_spec(n, dim)
+    index, spec = build_faiss_index(vectors, spec, metric=stores[0].index.metric_type)
+    del vectors
+    faiss.write_index(index, os.path.join(tmp_path, INDEX_FILE))
+
+    conn = sqlite3.connect(os.path.join(tmp_path, DOCSTORE_FILE))
+    try:
+        _create_chunks_table(conn)
+        offset = 0
+        for store in stores:
+            # Segment rows are its faiss ids 0..n-1; archive ids follow segment order.
+            rows = store.docstore.execute("SELECT row, id, page_content, metadata FROM chunks ORDER BY row")
+            conn.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?)", [(offset + r, i, t, m) for r, i, t, m in rows])
+            offset += store.index.ntotal
+        conn.commit()
+    finally:
+        conn.close()
+
+    meta = {
+        "params": params,
+        "chunks": n,
+        "index_spec": spec.to_dict(),
+        "documents": list(segments),
+        "built_at_iso": datetime.now(timezone.utc).isoformat(),
+    }
+    with open(os.path.join(tmp_path, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return spec
+
+
+def _swap_in(tmp_path: str, path: str, attempts: int = 5) -> None:
+    """
+    Sets the current version (if any) aside, then renames tmp_path into place. A directory
+    cannot be renamed over a non-empty one, so the swap is two renames: a reader landing
+    between them finds no index and treats it as a miss, never a half-written one. If
+    another writer installs its build in that gap, it is set aside in turn and we retry.
+    """
+    for _ in range(attempts):
+        old: Optional[str] = tmp_path + ".old"
+        try:
+            os.replace(path, old)
+        except FileNotFoundError:
+            old = None
+        try:
+            os.replace(tmp_path, path)
+            return
+        except OSError:
+            if not os.path.exists(path):
+                raise
+        finally:
+            # Processes that still map the old files keep their (unlinked) inodes until they close.
+            if old is not None:
+                shutil.rmtree(old, ignore_errors=True)
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    raise OSError(f"Could not install index at {path}: concurrent writers kept replacing it")
+
+
+def read_faiss_index(path: str, mmap: bool = True) -> Any:
+    if mmap:
+        try:
+            return faiss.read_index(path, MMAP_FLAGS)
+        except RuntimeError as e:
+            # Index types without mmap support fall back to a private in-RAM copy.
+            logger.info(f"Agent B: mmap not supported for {path} ({e}); reading into RAM.")
+    return faiss.read_index(path)
+
+
+def load_index(
+    path: str,
+    params: Dict[str, Any],
+    embeddings: Embeddings,
+    mmap: bool = True,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+) -> Optional[FAISS]:
+    """
+    Opens the persisted store at `path` if it was built with exactly `params`, else None
+    (missing, stale or unreadable -> caller rebuilds). The result is read-only.
+    nprobe / ef_search override the search settings recorded at build time.
+    """
+    meta_path = os.path.join(path, META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except Exception as e:
+        logger.info(f"Agent B: Unreadable index metadata at {meta_path}: {e}")
+        return None
+
+    if meta.get("params") != params:
+        logger.info(f"Agent B: Persisted index at {path} is stale (chunking/model changed). Rebuilding.")
+        return None
+
+    try:
+        index = read_faiss_index(os.path.join(path, INDEX_FILE), mmap=mmap)
+        built = meta.get("index_spec") or {}
+        apply_search_params(index, nprobe or built.get("nprobe"), ef_search or built.get("ef_search"))
+        docstore = SQLiteDocstore(os.path.join(path, DOCSTORE_FILE))
+        return FAISS(embeddings, index, docstore, SQLiteRowMap(docstore))
+    except Exception as e:
+        logger.info(f"Agent B: Failed to load persisted index at {path}: {e}")
+        return None
+
+
+def close_index(store: FAISS) -> None:
+    if isinstance(store.docstore, SQLiteDocstore):
+        store.docstore.close()
@@ -0,0 +1,86 @@
+import re
+import math
+import hashlib
+from typing import Any, List, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import SimpleChatModel
+from langchain_core.messages import BaseMessage
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class HashedNgramEmbeddings(Embeddings):
+    """
+    Deterministic, offline embedder: word unigrams/bigrams and character trigrams hashed
+    into a fixed-size vector (signed feature hashing), L2-normalised. No network, no
+    model weights; similar text still lands near each other, which is enough for
+    throughput benchmarks and CI.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self.model = f"hashed-ngram-{dim}"
+
+    def _features(self, text: str) -> List[str]:
+        words = _tokens(text)
+        feats = [f"w:{w}" for w in words]
+        feats += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+        for w in words:
+            padded = f"#{w}#"
+            feats += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+        return feats
+
+    def _embed(self, text: str) -> List[float]:
+        vec = [0.0] * self.dim
+        for feat in self._features(text):
+            h = int.from_bytes(hashlib.blake2b(feat.encode("utf-8"), digest_size=8).digest(), "little")
+            vec[h % self.dim] += 1.0 if (h >> 63) & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+        return [v / norm for v in vec]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+class ExtractiveStubChatModel(SimpleChatModel):
+    """
+    Offline stand-in for the QA LLM. Reads the guarded prompt, returns the context
+    sentence with the most word overlap with the question (or the guardrail refusal),
+    so retrieval and chain plumbing run end to end without an API call.
+    """
+
+    max_chars: int = 400
+
+    @property
+    def _llm_type(self) -> str:
+        return "extractive-stub"
+
+    def _call(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> str:
+        prompt = str(messages[-1].content) if messages else ""
+        context, _, rest = prompt.partition("Context:\n")[2].partition("\n\nQuestion:")
+        question = rest.split("\n", 1)[0]
+
+        q_words = set(_tokens(question))
+        best, best_score = "", 0
+        for sentence in re.split(r"(?<=[.!?])\s+|\n+", context):
+            score = len(q_words.intersection(_tokens(sentence)))
+            if score > best_score:
+                best, best_score = sentence.strip(), score
+
+        if not best:
+            return "I don't know based on the document."
+        return best[: self.max_chars]
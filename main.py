@@ -4,28 +4,34 @@ import sys
 import json
 import os
 
-from agent_a import DownloadAgent, HANDOFF_PATH
-from agent_b import QueryAgent
+# The agents (playwright, langchain, faiss, openai) are imported where they are used,
+# so --help and argument errors return immediately.
 
-async def main(url: str):
+async def main(url: str, offline: bool = False, browser_profile: str = None, force_refresh: bool = False):
     print("--- Bravebird System Initialized ---")
+    backend = "local" if offline else None
+    from agent_a import DownloadAgent, HANDOFF_PATH
 
     # --- PHASE 1: Agent A (Download) ---
-    downloader = DownloadAgent()
+    downloader = DownloadAgent(planner=backend, browser_profile=browser_profile)
 
     try:
         print("Agent A: Launching browser download flow...")
         # Hard 10-min cap (requirement)
-        await asyncio.wait_for(downloader.run(url, max_seconds=600), timeout=600)
+        await asyncio.wait_for(downloader.run(url, max_seconds=600, force_refresh=force_refresh), timeout=600)
     except asyncio.TimeoutError:
         print("System Error: Agent A timed out (>10 mins).")
         sys.exit(1)
     except Exception as e:
         print(f"System Error: Agent A failed. {e}")
         sys.exit(1)
+    finally:
+        await downloader.close()
 
     # --- PHASE 2: Agent B (Query) ---
-    analyst = QueryAgent()
+    from agent_b import QueryAgent
+
+    analyst = QueryAgent(embedding_backend=backend, llm_backend=backend)
 
     try:
         if not os.path.exists(HANDOFF_PATH):
@@ -46,6 +52,9 @@ async def main(url: str):
         print(f"Agent B Error: Failed to index document. {e}")
         sys.exit(1)
 
+    _chat(analyst)
+
+def _chat(analyst):
     # --- INTERACTIVE LOOP (CLI) ---
     print("Agent B: The document is ready. Ask me anything about it.")
     print("(Type 'exit' to quit)\n")
@@ -65,8 +74,54 @@ async def main(url: str):
                 print(f"Sources (pages): {pages}")
         print()
 
+def main_query(sha256: str = None, handoff_path: str = None, offline: bool = False):
+    """Query-only: open an already-processed document's persisted index; Agent A never runs."""
+    from agent_b import open_query_session
+
+    try:
+        analyst = open_query_session(sha256=sha256, handoff_path=handoff_path, backend="local" if offline else None)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Agent B Error: {e}")
+        sys.exit(1)
+    for doc in analyst.list_documents():
+        print(f"Document: {doc['file_name']} (sha256={doc['sha256'][:12]}, {doc['chunks']} chunks)\n")
+    _chat(analyst)
+
+async def main_batch(batch_file: str, concurrency: int, deadline: float, out_path: str, offline: bool = False, browser_profile: str = None, force_refresh: bool = False):
+    from batch_download import load_batch_urls, run_batch
+
+    urls = load_batch_urls(batch_file)
+    print(f"--- Batch download: {len(urls)} URLs, concurrency={concurrency}, deadline={deadline:g}s ---")
+    report = await run_batch(
+        urls,
+        concurrency=concurrency,
+        deadline_s=deadline,
+        out_path=out_path,
+        planner="local" if offline else None,
+        browser_profile=browser_profile,
+        force_refresh=force_refresh,
+    )
+    print(json.dumps(report, indent=2))
+    if report["failed"]:
+        sys.exit(1)
+
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
-    ap.add_argument("--url", required=True, help="Public Google Drive PDF link (browser download flow, no API).")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--url", help="Public Google Drive PDF link (browser download flow, no API).")
+    src.add_argument("--batch", metavar="FILE", help="Download every URL in FILE (one per line, or JSONL with url/source_url); no Q&A.")
+    src.add_argument("--sha256", help="Query-only: open the persisted index of an already-processed document (hash or unique prefix); no download.")
+    src.add_argument("--handoff", metavar="PATH", help="Query-only: open the document of an existing handoff JSON from its persisted index (indexed first if it has none); no download.")
+    ap.add_argument("--offline", action="store_true", help="Use local planner/embedding/LLM backends (no API calls).")
+    ap.add_argument("--browser-profile", choices=["headed", "headless", "new-headless"], default=None, help="Chromium launch profile (default: $AGENT_A_BROWSER_PROFILE or headed).")
+    ap.add_argument("--force-refresh", action="store_true", help="Download again even if the URL is in the download manifest.")
+    ap.add_argument("--concurrency", type=int, default=4, help="Batch mode: downloads in flight at once.")
+    ap.add_argument("--deadline", type=float, default=600, help="Batch mode: seconds allowed per URL, retries included.")
+    ap.add_argument("--batch-out", default=os.path.join("sandbox", "batch_handoffs.jsonl"), help="Batch mode: JSONL file receiving one handoff record per URL.")
     args = ap.parse_args()
-    asyncio.run(main(args.url))
+    if args.sha256 or args.handoff:
+        main_query(sha256=args.sha256, handoff_path=args.handoff, offline=args.offline)
+    elif args.batch:
+        asyncio.run(main_batch(args.batch, args.concurrency, args.deadline, args.batch_out, offline=args.offline, browser_profile=args.browser_profile, force_refresh=args.force_refresh))
+    else:
+        asyncio.run(main(args.url, offline=args.offline, browser_profile=args.browser_profile, force_refresh=args.force_refresh))
@@ -0,0 +1,16 @@
+"""
+Page-range text extraction for agent_b's process pool. Kept apart from agent_b because
+pool workers are spawned fresh and import the module holding their target: this one
+costs pypdf alone, agent_b would pull in faiss and langchain in every worker.
+"""
+from typing import List, Tuple
+
+
+def extract_page_range(file_path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    """
+    Worker: text of pages [start, end). Runs in a child process, so it opens its own reader.
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(file_path)
+    return [(i, reader.pages[i].extract_text(extraction_mode="plain")) for i in range(start, end)]
@@ -0,0 +1,122 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+
+DEFAULT_TTL_S = 7 * 24 * 3600
+DEFAULT_MIN_SUCCESS_RATE = 0.6
+
+
+def _normalize_label(label: str) -> str:
+    # "Thumbnail 17" / "Page 3 of 12" collapse to one shape; case and spacing don't matter.
+    return re.sub(r"\d+", "#", " ".join(label.lower().split()))
+
+
+def page_state_fingerprint(page_state: Dict[str, Any]) -> str:
+    """
+    Layout identity of a _collect_page_state snapshot: host, title pattern (the part
+    after the last " - ", i.e. "Google Drive", not the file name) and the normalized
+    button set. Two files opened in the same viewer layout share a fingerprint.
+    """
+    title = page_state.get("title") or ""
+    title_pattern = _normalize_label(title.rsplit(" - ", 1)[-1]) if " - " in title else ""
+    host = urlparse(page_state.get("url") or "").hostname or ""
+    buttons = sorted({_normalize_label(b) for b in page_state.get("buttons") or []})
+    raw = json.dumps({"host": host, "title": title_pattern, "buttons": buttons}, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class PlannerDecisionCache:
+    """
+    fingerprint -> planner action, with per-action success/failure counts.
+    A cached action is reused only while it is fresh (last success within ttl_s) and its
+    success rate stays at or above min_success_rate; otherwise the planner is asked again
+    and its answer starts competing with the cached one.
+    """
+
+    def __init__(self, path: str, ttl_s: float = DEFAULT_TTL_S, min_success_rate: float = DEFAULT_MIN_SUCCESS_RATE):
+        self.path = path
+        self.ttl_s = ttl_s
+        self.min_success_rate = min_success_rate
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS decisions ("
+            " fingerprint TEXT NOT NULL,"
+            " action TEXT NOT NULL,"
+            " successes INTEGER NOT NULL DEFAULT 0,"
+            " failures INTEGER NOT NULL DEFAULT 0,"
+            " last_success REAL,"
+            " PRIMARY KEY (fingerprint, action))"
+        )
+        self._conn.commit()
+
+    def lookup(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Best proven action for this layout as a plan dict, or None (ask the planner)."""
+        cutoff = time.time() - self.ttl_s
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT action, successes, failures FROM decisions"
+                " WHERE fingerprint = ? AND successes > 0 AND last_success >= ?",
+                (fingerprint, cutoff),
+            ).fetchall()
+        best = None
+        for action, ok, bad in rows:
+            rate = ok / (ok + bad)
+            if rate >= self.min_success_rate and (best is None or (rate, ok) > (best[1], best[2])):
+                best = (action, rate, ok)
+        if best is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        action, rate, ok = best
+        return {"action": action, "rationale": f"Cached decision for this layout ({ok} successes, {rate:.0%} success rate)."}
+
+    def record(self, fingerprint: str, action: str, success: bool) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO decisions (fingerprint, action) VALUES (?, ?)", (fingerprint, action)
+            )
+            if success:
+                self._conn.execute(
+                    "UPDATE decisions SET successes = successes + 1, last_success = ?"
+                    " WHERE fingerprint = ? AND action = ?",
+                    (now, fingerprint, action),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE decisions SET failures = failures + 1 WHERE fingerprint = ? AND action = ?",
+                    (fingerprint, action),
+                )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            layouts, successes, failures = self._conn.execute(
+                "SELECT COUNT(DISTINCT fingerprint), COALESCE(SUM(successes), 0), COALESCE(SUM(failures), 0) FROM decisions"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "layouts": layouts,
+            "recorded_successes": successes,
+            "recorded_failures": failures,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
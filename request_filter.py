@@ -0,0 +1,104 @@
+import re
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger("agent_a")
+
+DEFAULT_BLOCKED_TYPES = ("image", "media", "font")
+DEFAULT_BLOCKED_URL_PATTERNS = (
+    r"google-analytics\.com",
+    r"googletagmanager\.com",
+    r"doubleclick\.net",
+    r"/gen_204",  # Drive/Google client telemetry beacons
+    r"/log\?",
+    r"/thumbnail\?",
+    r"/viewer2/prod-\d+/img\?",  # Drive PDF preview render tiles
+    r"lh\d\.googleusercontent\.com",
+)
+# Never blocked, whatever the type/pattern rules say: the file itself and Drive's
+# download endpoints (the "Download anyway" interstitial lives on drive.usercontent).
+DEFAULT_ALLOWED_URL_PATTERNS = (
+    r"drive\.usercontent\.google\.com",
+    r"[?&]export=download",
+    r"/uc\?",
+    r"\.pdf(\?|$)",
+)
+
+
+@dataclass
+class RequestFilterStats:
+    requests_allowed: int = 0
+    requests_blocked: int = 0
+    bytes_loaded: int = 0  # Content-Length of allowed responses (aborted requests never report a size)
+    blocked_by_type: Counter = field(default_factory=Counter)
+    blocked_by_pattern: Counter = field(default_factory=Counter)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests_allowed": self.requests_allowed,
+            "requests_blocked": self.requests_blocked,
+            "bytes_loaded": self.bytes_loaded,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "blocked_by_pattern": dict(self.blocked_by_pattern),
+        }
+
+
+class RequestFilter:
+    """
+    Route-interception rules for Agent A's browser contexts: abort requests whose
+    resource type or URL is on the block lists, unless the URL matches the allowlist.
+    Top-level document navigations are never blocked. Rules are shared; attach()
+    returns fresh per-context counters.
+    """
+
+    def __init__(
+        self,
+        blocked_types: Iterable[str] = DEFAULT_BLOCKED_TYPES,
+        blocked_url_patterns: Iterable[str] = DEFAULT_BLOCKED_URL_PATTERNS,
+        allowed_url_patterns: Iterable[str] = DEFAULT_ALLOWED_URL_PATTERNS,
+    ):
+        self.blocked_types = frozenset(blocked_types)
+        self.blocked_url_patterns = [re.compile(p) for p in blocked_url_patterns]
+        self.allowed_url_patterns = [re.compile(p) for p in allowed_url_patterns]
+
+    def verdict(self, url: str, resource_type: str) -> Optional[str]:
+        """The rule that blocks this request ("type:<t>" / "url:<pattern>"), or None to allow."""
+        if resource_type == "document" or any(p.search(url) for p in self.allowed_url_patterns):
+            return None
+        if resource_type in self.blocked_types:
+            return f"type:{resource_type}"
+        for p in self.blocked_url_patterns:
+            if p.search(url):
+                return f"url:{p.pattern}"
+        return None
+
+    async def attach(self, context) -> RequestFilterStats:
+        stats = RequestFilterStats()
+
+        async def _route(route, request):
+            rule = self.verdict(request.url, request.resource_type)
+            if rule is None:
+                stats.requests_allowed += 1
+                await route.continue_()
+                return
+            stats.requests_blocked += 1
+            if rule.startswith("type:"):
+                stats.blocked_by_type[request.resource_type] += 1
+            else:
+                stats.blocked_by_pattern[rule[4:]] += 1
+            await route.abort("blockedbyclient")
+
+        def _on_response(response):
+            try:
+                stats.bytes_loaded += int(response.headers.get("content-length") or 0)
+            except ValueError:
+                pass
+
+        await context.route("**/*", _route)
+        context.on("response", _on_response)
+        return stats
+
+
+DEFAULT_REQUEST_FILTER = RequestFilter()
@@ -0,0 +1,55 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, List
+
+
+class SelectorStats:
+    """
+    Persisted per-selector probe outcomes (probes, hits) for Agent A's download-button
+    candidates. rank() orders candidates by smoothed hit rate, (hits + 1) / (probes + 2),
+    so unseen candidates sit at 0.5 and ties keep the caller's original order.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS selector_hits ("
+            " name TEXT PRIMARY KEY,"
+            " probes INTEGER NOT NULL DEFAULT 0,"
+            " hits INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.commit()
+
+    def rank(self, names: List[str]) -> List[str]:
+        with self._lock:
+            marks = ",".join("?" * len(names))
+            rows = self._conn.execute(
+                f"SELECT name, probes, hits FROM selector_hits WHERE name IN ({marks})", names
+            ).fetchall()
+        rate = {name: (hits + 1) / (probes + 2) for name, probes, hits in rows}
+        order = {name: i for i, name in enumerate(names)}
+        return sorted(names, key=lambda n: (-rate.get(n, 0.5), order[n]))
+
+    def record(self, outcomes: Dict[str, bool]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO selector_hits (name, probes, hits) VALUES (?, 1, ?)"
+                " ON CONFLICT(name) DO UPDATE SET probes = probes + 1, hits = hits + excluded.hits",
+                [(name, int(hit)) for name, hit in outcomes.items()],
+            )
+            self._conn.commit()
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT name, probes, hits FROM selector_hits").fetchall()
+        return {name: {"probes": probes, "hits": hits} for name, probes, hits in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
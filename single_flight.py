@@ -0,0 +1,60 @@
+import copy
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Set
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls per key: the first caller starts fn() as a task, callers
+    arriving while it runs await the same task, and everyone gets (a deep copy of) the
+    same result or exception. The task is shielded, so one caller timing out or being
+    cancelled does not abort it for the others; once the last caller has left, the task
+    is cancelled, so a deadline still stops the work behind it.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, "asyncio.Task[Any]"] = {}
+        self._waiters: Dict["asyncio.Task[Any]", int] = {}
+        # Cancelled flights still unwinding; no longer joinable, but close() must wait for them.
+        self._abandoned: Set["asyncio.Task[Any]"] = set()
+        self.stats = {"flights": 0, "coalesced": 0, "abandoned": 0}
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._tasks
+
+    def _forget(self, key: str, task: "asyncio.Task[Any]") -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            self.stats["flights"] += 1
+            task.add_done_callback(lambda t, key=key: self._forget(key, t))
+        else:
+            self.stats["coalesced"] += 1
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            result = await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():  # every caller was cancelled: nobody wants the result
+                    # Forget it before cancelling: it may take a while to unwind (closing a
+                    # browser context), and a new caller must start fresh, not join it.
+                    self._forget(key, task)
+                    self._abandoned.add(task)
+                    task.add_done_callback(self._abandoned.discard)
+                    task.cancel()
+                    self.stats["abandoned"] += 1
+        return copy.deepcopy(result)
+
+    async def cancel_all(self) -> None:
+        """Cancels every flight and waits for them to unwind (call before closing what they use)."""
+        tasks = list(self._tasks.values()) + list(self._abandoned)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
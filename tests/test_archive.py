@@ -0,0 +1,104 @@
+"""
+Collection archive (agent_b.QueryAgent.compact): the archive's index type follows the
+collection's size rather than any one document's, whole-collection queries are served
+from it, removed documents are filtered out, and a new agent reopens it from disk.
+
+    python -m pytest tests/  (or: python -m unittest discover tests)
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_b import CollectionRetriever, QueryAgent  # noqa: E402
+from bench.bench_ann_recall import clustered  # noqa: E402
+from bench.bench_archive import FixedQueryEmbeddings, build_segments  # noqa: E402
+from index_store import FLAT_MAX_VECTORS  # noqa: E402
+
+SEGMENTS = 24
+CHUNKS = 1000  # each segment exact, the collection past FLAT_MAX_VECTORS
+DIM = 16
+
+
+class ArchiveTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._cwd = os.getcwd()
+        cls.tmp = tempfile.mkdtemp(prefix="agent_b_archive_")
+        os.chdir(cls.tmp)  # QueryAgent sets up sandbox/logs relative to the cwd
+        data = clustered(SEGMENTS * CHUNKS + 10, DIM, clusters=32, rng=np.random.default_rng(0))
+        cls.vectors, cls.queries = data[: SEGMENTS * CHUNKS], data[SEGMENTS * CHUNKS:]
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls._cwd)
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def setUp(self):
+        self.index_dir = tempfile.mkdtemp(dir=self.tmp)
+        self.agent = self._agent()
+        build_segments(self.agent, self.vectors, SEGMENTS)
+
+    def _agent(self, compact_after=None) -> QueryAgent:
+        return QueryAgent(
+            embeddings=FixedQueryEmbeddings(self.queries),
+            index_dir=self.index_dir,
+            embedding_cache_path=None,
+            llm_backend="local",
+            compact_after=compact_after,
+        )
+
+    def _top(self, agent: QueryAgent, i: int):
+        return [d.page_content for d in CollectionRetriever(agent=agent, k=5).invoke(str(i))]
+
+    def test_archive_index_is_chosen_by_collection_size(self):
+        self.assertLess(CHUNKS, FLAT_MAX_VECTORS)
+        stats = self.agent.compact()
+        self.assertEqual(stats["documents"], SEGMENTS)
+        self.assertEqual(stats["chunks"], SEGMENTS * CHUNKS)
+        self.assertEqual(stats["index_spec"]["kind"], "ivfflat")
+
+    def test_archive_matches_segment_fan_out(self):
+        exact = [self._top(self.agent, i) for i in range(len(self.queries))]
+        self.agent.compact()
+        found = [self._top(self.agent, i) for i in range(len(self.queries))]
+        hits = sum(len(set(f) & set(e)) for f, e in zip(found, exact))
+        self.assertGreaterEqual(hits / (5 * len(exact)), 0.9)
+
+    def test_removed_document_is_filtered_from_archive_results(self):
+        self.agent.compact()
+        top_doc = self.agent.archive.similarity_search_by_vector(self.queries[0].tolist(), k=1)[0]
+        removed = top_doc.metadata["doc_sha256"]
+        self.assertTrue(self.agent.remove_document(removed))
+        docs = CollectionRetriever(agent=self.agent, k=5).invoke("0")
+        self.assertEqual(len(docs), 5)
+        self.assertNotIn(removed, {d.metadata["doc_sha256"] for d in docs})
+
+    def test_new_agent_reopens_archive_and_its_documents(self):
+        self.agent.compact()
+        expected = self._top(self.agent, 0)
+        reopened = self._agent()
+        stats = reopened.open_archive()
+        self.assertEqual(stats["documents"], SEGMENTS)
+        self.assertEqual(reopened.archive_docs, frozenset(reopened.documents))
+        self.assertEqual(self._top(reopened, 0), expected)
+
+    def test_auto_compaction_waits_for_the_archive_to_double(self):
+        agent = self._agent(compact_after=8)
+        for sha256 in self.agent.documents:
+            agent.open_document(sha256)
+        # Compacts at 8 and 16 documents; at 24 only 8 are outside a 16-document archive.
+        self.assertEqual(len(agent.archive_docs), 16)
+
+    def test_missing_archive_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            self._agent().open_archive()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Persisted per-document indexes (agent_b): a second QueryAgent on the same index_dir opens
+the saved index instead of re-embedding, and a chunking or embedding-model change
+rebuilds it. Runs on the local backends with a counting embedder, no network.
+
+    python -m pytest tests/  (or: python -m unittest discover tests)
+"""
+import os
+import sys
+import shutil
+import hashlib
+import tempfile
+import unittest
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.embeddings import Embeddings  # noqa: E402
+
+from agent_b import QueryAgent  # noqa: E402
+from bench.synth_pdf import make_pdf  # noqa: E402
+from local_models import HashedNgramEmbeddings  # noqa: E402
+
+
+class CountingEmbeddings(Embeddings):
+    """Local embedder that counts every embedding call it receives."""
+
+    def __init__(self, model: str = "counting-hashed-64"):
+        self.model = model
+        self._inner = HashedNgramEmbeddings(dim=64)
+        self.document_calls = 0
+        self.query_calls = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.document_calls += 1
+        return self._inner.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        self.query_calls += 1
+        return self._inner.embed_query(text)
+
+
+class IndexPersistenceTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._cwd = os.getcwd()
+        cls.tmp = tempfile.mkdtemp(prefix="agent_b_index_")
+        os.chdir(cls.tmp)  # QueryAgent sets up sandbox/logs relative to the cwd
+        pdf = make_pdf(os.path.join(cls.tmp, "doc.pdf"), pages=4)
+        with open(pdf, "rb") as f:
+            sha256 = hashlib.sha256(f.read()).hexdigest()
+        cls.handoff = {"file_path": pdf, "file_name": "doc.pdf", "sha256": sha256}
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls._cwd)
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def setUp(self):
+        self.index_dir = tempfile.mkdtemp(dir=self.tmp)
+
+    def _agent(self, embeddings: Embeddings, **kwargs) -> QueryAgent:
+        return QueryAgent(
+            embeddings=embeddings,
+            index_dir=self.index_dir,
+            embedding_cache_path=None,
+            llm_backend="local",
+            **kwargs,
+        )
+
+    def test_second_start_issues_zero_embedding_calls(self):
+        first = CountingEmbeddings()
+        info = self._agent(first).add_document(self.handoff)
+        self.assertGreater(first.document_calls, 0)
+
+        second = CountingEmbeddings()
+        reopened = self._agent(second).add_document(self.handoff)
+        self.assertEqual(second.document_calls, 0)
+        self.assertEqual(reopened["chunks"], info["chunks"])
+
+    def test_chunk_size_change_rebuilds(self):
+        self._agent(CountingEmbeddings()).add_document(self.handoff)
+        changed = CountingEmbeddings()
+        self._agent(changed, chunk_size=1000, chunk_overlap=100).add_document(self.handoff)
+        self.assertGreater(changed.document_calls, 0)
+
+    def test_embedding_model_change_rebuilds(self):
+        self._agent(CountingEmbeddings()).add_document(self.handoff)
+        other_model = CountingEmbeddings(model="counting-hashed-64-v2")
+        self._agent(other_model).add_document(self.handoff)
+        self.assertGreater(other_model.document_calls, 0)
+
+    def test_resolve_sha256_accepts_only_hex_prefixes(self):
+        agent = self._agent(CountingEmbeddings())
+        agent.add_document(self.handoff)
+        sha256 = self.handoff["sha256"]
+        self.assertEqual(agent.resolve_sha256(sha256[:8].upper()), sha256)
+        self.assertEqual(agent.resolve_sha256(sha256), sha256)
+        for bad in ("", "  ", "..", "../" + sha256[:8], sha256 + "0", "xyz"):
+            with self.assertRaises(ValueError, msg=bad):
+                agent.resolve_sha256(bad)
+
+
+if __name__ == "__main__":
+    unittest.main()
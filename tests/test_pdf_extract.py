@@ -0,0 +1,48 @@
+"""
+Parallel page extraction (agent_b.iter_pdf_pages): the process-pool path yields every
+page in order with the serial path's text, and closing the generator early returns
+without parsing the remaining shards.
+
+    python -m pytest tests/  (or: python -m unittest discover tests)
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent_b import PARALLEL_EXTRACT_MIN_PAGES, iter_pdf_pages  # noqa: E402
+from bench.synth_pdf import make_pdf  # noqa: E402
+
+
+class ParallelExtractTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp(prefix="agent_b_extract_")
+        cls.pages = PARALLEL_EXTRACT_MIN_PAGES + 16
+        cls.pdf = make_pdf(os.path.join(cls.tmp, "doc.pdf"), pages=cls.pages)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def test_pool_matches_serial_in_page_order(self):
+        serial = list(iter_pdf_pages(self.pdf, workers=1))
+        parallel = list(iter_pdf_pages(self.pdf, workers=2))
+        self.assertEqual([d.metadata["page"] for d in parallel], list(range(self.pages)))
+        self.assertEqual([d.page_content for d in parallel], [d.page_content for d in serial])
+        self.assertEqual({d.metadata["source"] for d in parallel}, {self.pdf})
+
+    def test_early_close_does_not_wait_for_remaining_shards(self):
+        pages = iter_pdf_pages(self.pdf, workers=2)
+        self.assertEqual(next(pages).metadata["page"], 0)
+        t0 = time.perf_counter()
+        pages.close()
+        self.assertLess(time.perf_counter() - t0, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
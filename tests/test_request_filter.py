@@ -0,0 +1,131 @@
+"""
+RequestFilter (agent_a's route interception): verdict() precedence (document navigations
+and the allowlist win over type and URL rules) and the per-context RequestFilterStats
+counters, driven through attach() with a stand-in context. No browser needed.
+
+    python -m pytest tests/  (or: python -m unittest discover tests)
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from request_filter import RequestFilter  # noqa: E402
+
+
+class StubRequest:
+    def __init__(self, url: str, resource_type: str):
+        self.url = url
+        self.resource_type = resource_type
+
+
+class StubRoute:
+    def __init__(self):
+        self.outcome = None
+
+    async def continue_(self):
+        self.outcome = "continued"
+
+    async def abort(self, error_code: str = "failed"):
+        self.outcome = f"aborted:{error_code}"
+
+
+class StubResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class StubContext:
+    """Records the route handler and response listener that attach() registers."""
+
+    def __init__(self):
+        self.handler = None
+        self.listeners = {}
+
+    async def route(self, pattern, handler):
+        self.handler = handler
+
+    def on(self, event, listener):
+        self.listeners[event] = listener
+
+
+class VerdictTest(unittest.TestCase):
+    def setUp(self):
+        self.filter = RequestFilter()
+
+    def test_allowlist_beats_type_and_url_rules(self):
+        for url, resource_type in [
+            ("https://drive.usercontent.google.com/download?id=abc", "image"),
+            ("https://drive.google.com/uc?id=abc&export=download", "font"),
+            ("https://example.com/files/report.pdf", "media"),
+            ("https://example.com/files/report.pdf?x=1", "image"),
+            ("https://drive.google.com/gen_204?export=download", "ping"),
+        ]:
+            self.assertIsNone(self.filter.verdict(url, resource_type), url)
+
+    def test_document_requests_are_never_blocked(self):
+        for url in ("https://www.google-analytics.com/collect", "https://drive.google.com/thumbnail?id=abc"):
+            self.assertIsNone(self.filter.verdict(url, "document"), url)
+
+    def test_images_and_fonts_are_blocked_by_type(self):
+        self.assertEqual(self.filter.verdict("https://drive.google.com/static/logo.png", "image"), "type:image")
+        self.assertEqual(self.filter.verdict("https://fonts.gstatic.com/s/roboto.woff2", "font"), "type:font")
+
+    def test_telemetry_is_blocked_by_url(self):
+        for url, pattern in [
+            ("https://www.google-analytics.com/g/collect?v=2", r"google-analytics\.com"),
+            ("https://www.googletagmanager.com/gtag/js?id=G-1", r"googletagmanager\.com"),
+            ("https://drive.google.com/gen_204?event=open", r"/gen_204"),
+            ("https://drive.google.com/log?format=json", r"/log\?"),
+        ]:
+            self.assertEqual(self.filter.verdict(url, "xhr"), f"url:{pattern}", url)
+
+    def test_other_requests_are_allowed(self):
+        self.assertIsNone(self.filter.verdict("https://drive.google.com/static/viewer.js", "script"))
+        self.assertIsNone(self.filter.verdict("https://drive.google.com/static/viewer.css", "stylesheet"))
+
+
+class StatsTest(unittest.IsolatedAsyncioTestCase):
+    async def test_attach_counts_allowed_blocked_and_bytes(self):
+        context = StubContext()
+        stats = await RequestFilter().attach(context)
+        requests = [
+            ("https://drive.google.com/file/d/abc/view", "document"),
+            ("https://drive.google.com/static/viewer.js", "script"),
+            ("https://drive.google.com/static/tile.png", "image"),
+            ("https://drive.google.com/static/tile2.png", "image"),
+            ("https://fonts.gstatic.com/s/roboto.woff2", "font"),
+            ("https://drive.google.com/gen_204?event=open", "ping"),
+        ]
+        routes = []
+        for url, resource_type in requests:
+            route = StubRoute()
+            await context.handler(route, StubRequest(url, resource_type))
+            routes.append(route)
+
+        self.assertEqual([r.outcome for r in routes[:2]], ["continued"] * 2)
+        self.assertEqual({r.outcome for r in routes[2:]}, {"aborted:blockedbyclient"})
+        self.assertEqual(stats.requests_allowed, 2)
+        self.assertEqual(stats.requests_blocked, 4)
+        self.assertEqual(dict(stats.blocked_by_type), {"image": 2, "font": 1})
+        self.assertEqual(dict(stats.blocked_by_pattern), {r"/gen_204": 1})
+
+        on_response = context.listeners["response"]
+        for headers in ({"content-length": "1000"}, {"content-length": "24"}, {}, {"content-length": "n/a"}):
+            on_response(StubResponse(headers))
+        self.assertEqual(stats.bytes_loaded, 1024)
+        self.assertEqual(stats.to_dict()["requests_blocked"], 4)
+
+    async def test_each_attach_gets_its_own_counters(self):
+        rules = RequestFilter()
+        first, second = StubContext(), StubContext()
+        first_stats = await rules.attach(first)
+        second_stats = await rules.attach(second)
+        await first.handler(StubRoute(), StubRequest("https://example.com/a.png", "image"))
+        self.assertEqual(first_stats.requests_blocked, 1)
+        self.assertEqual(second_stats.requests_blocked, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
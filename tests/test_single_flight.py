@@ -0,0 +1,105 @@
+"""
+SingleFlight (agent_a's per-URL download coalescing) with stub coroutines: one call per
+key for concurrent callers, shared results and errors, cancellation semantics, and no
+joining a flight that is being abandoned.
+
+    python -m pytest tests/  (or: python -m unittest discover tests)
+"""
+import os
+import sys
+import asyncio
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from single_flight import SingleFlight  # noqa: E402
+
+
+class StubWork:
+    """Counts calls; each call sleeps `delay` (unwinding for `unwind` more when cancelled)."""
+
+    def __init__(self, delay: float = 0.05, unwind: float = 0.0, error: Exception = None):
+        self.delay = delay
+        self.unwind = unwind
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+
+    async def __call__(self):
+        self.calls += 1
+        n = self.calls
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            await asyncio.sleep(self.unwind)  # e.g. closing a browser context
+            raise
+        if self.error is not None:
+            raise self.error
+        return {"call": n, "files": ["a.pdf"]}
+
+
+class SingleFlightTest(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_callers_share_one_call(self):
+        flights, work = SingleFlight(), StubWork()
+        results = await asyncio.gather(*[flights.do("u", work) for _ in range(8)])
+        self.assertEqual(work.calls, 1)
+        self.assertEqual({r["call"] for r in results}, {1})
+        self.assertEqual(flights.stats["flights"], 1)
+        self.assertEqual(flights.stats["coalesced"], 7)
+        results[0]["files"].append("mutated.pdf")  # every caller gets its own copy
+        self.assertEqual(results[1]["files"], ["a.pdf"])
+        self.assertFalse(flights.in_flight("u"))
+
+    async def test_exception_reaches_every_caller(self):
+        flights, work = SingleFlight(), StubWork(error=RuntimeError("download failed"))
+        results = await asyncio.gather(*[flights.do("u", work) for _ in range(3)], return_exceptions=True)
+        self.assertEqual(work.calls, 1)
+        for r in results:
+            self.assertIsInstance(r, RuntimeError)
+
+    async def test_cancelling_leader_leaves_followers_running(self):
+        flights, work = SingleFlight(), StubWork(delay=0.1)
+        leader = asyncio.ensure_future(flights.do("u", work))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(flights.do("u", work)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        self.assertEqual([r["call"] for r in results], [1, 1])
+        self.assertEqual(work.cancelled, 0)
+        self.assertEqual(flights.stats["abandoned"], 0)
+
+    async def test_last_caller_leaving_cancels_the_flight(self):
+        flights, work = SingleFlight(), StubWork(delay=1.0)
+        for _ in range(2):
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(flights.do("u", work), timeout=0.02)
+        await asyncio.sleep(0.01)
+        self.assertEqual(work.calls, 2)  # each timed-out caller's flight was dropped
+        self.assertEqual(work.cancelled, 2)
+        self.assertEqual(flights.stats["abandoned"], 2)
+        self.assertFalse(flights.in_flight("u"))
+
+    async def test_new_caller_does_not_join_an_unwinding_flight(self):
+        flights, work = SingleFlight(), StubWork(delay=0.05, unwind=0.2)
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(flights.do("u", work), timeout=0.01)
+        # The abandoned flight is still unwinding; a fresh caller must get a new call.
+        self.assertFalse(flights.in_flight("u"))
+        result = await flights.do("u", work)
+        self.assertEqual(result["call"], 2)
+
+    async def test_cancel_all_waits_for_unwinding_flights(self):
+        flights, work = SingleFlight(), StubWork(delay=1.0, unwind=0.05)
+        pending = asyncio.ensure_future(flights.do("a", work))
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(flights.do("b", work), timeout=0.01)
+        await flights.cancel_all()
+        self.assertEqual(work.cancelled, 2)
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+
+
+if __name__ == "__main__":
+    unittest.main()